@@ -0,0 +1,107 @@
+"""Initial schema
+
+Databases created by ``Base.metadata.create_all`` before migrations existed
+already have these tables, so each one is only created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('workers'):
+        op.create_table(
+            'workers',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('email', sa.String(100)),
+            sa.Column('phone', sa.String(20)),
+            sa.Column('position', sa.String(100)),
+            sa.Column('hourly_rate', sa.Float()),
+            sa.Column('is_active', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_workers_id', 'workers', ['id'])
+        op.create_index('ix_workers_email', 'workers', ['email'], unique=True)
+
+    if not _has_table('shifts'):
+        op.create_table(
+            'shifts',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('worker_id', sa.Integer(), sa.ForeignKey('workers.id'), nullable=False),
+            sa.Column('date', sa.DateTime(), nullable=False),
+            sa.Column('start_time', sa.DateTime(), nullable=False),
+            sa.Column('end_time', sa.DateTime(), nullable=False),
+            sa.Column('is_recurring', sa.Boolean()),
+            sa.Column('recurrence_pattern', sa.String(50)),
+            sa.Column('status', sa.String(20)),
+            sa.Column('notes', sa.Text()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_shifts_id', 'shifts', ['id'])
+
+    if not _has_table('time_records'):
+        op.create_table(
+            'time_records',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('worker_id', sa.Integer(), sa.ForeignKey('workers.id'), nullable=False),
+            sa.Column('shift_id', sa.Integer(), sa.ForeignKey('shifts.id')),
+            sa.Column('clock_in', sa.DateTime(), nullable=False),
+            sa.Column('clock_out', sa.DateTime()),
+            sa.Column('break_start', sa.DateTime()),
+            sa.Column('break_end', sa.DateTime()),
+            sa.Column('total_hours', sa.Float()),
+            sa.Column('overtime_hours', sa.Float()),
+            sa.Column('status', sa.String(20)),
+            sa.Column('notes', sa.Text()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_time_records_id', 'time_records', ['id'])
+
+    if not _has_table('holidays'):
+        op.create_table(
+            'holidays',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('date', sa.DateTime(), nullable=False),
+            sa.Column('is_recurring', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index('ix_holidays_id', 'holidays', ['id'])
+
+    if not _has_table('daily_rollups'):
+        op.create_table(
+            'daily_rollups',
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('clock_ins', sa.Integer(), nullable=False),
+            sa.Column('total_hours', sa.Float(), nullable=False),
+            sa.Column('overtime_hours', sa.Float(), nullable=False),
+        )
+
+    if not _has_table('stats_counters'):
+        op.create_table(
+            'stats_counters',
+            sa.Column('name', sa.String(50), primary_key=True),
+            sa.Column('value', sa.Integer(), nullable=False),
+        )
+
+
+def downgrade():
+    for table in ('stats_counters', 'daily_rollups', 'holidays', 'time_records', 'shifts', 'workers'):
+        op.drop_table(table)
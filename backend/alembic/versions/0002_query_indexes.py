@@ -0,0 +1,42 @@
+"""Indexes for the routers' query patterns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status = 'active'")
+
+
+def _create_index(name, table, columns, **kw):
+    # create_all() may already have built it on a fresh database
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, **kw)
+
+
+def upgrade():
+    _create_index('ix_time_records_worker_status', 'time_records', ['worker_id', 'status'])
+    _create_index('ix_time_records_clock_in', 'time_records', ['clock_in'])
+    _create_index(
+        'ix_time_records_active_worker', 'time_records', ['worker_id'],
+        sqlite_where=ACTIVE, postgresql_where=ACTIVE
+    )
+    _create_index('ix_shifts_worker_date_status', 'shifts', ['worker_id', 'date', 'status'])
+    _create_index('ix_shifts_date', 'shifts', ['date'])
+
+
+def downgrade():
+    op.drop_index('ix_shifts_date', table_name='shifts')
+    op.drop_index('ix_shifts_worker_date_status', table_name='shifts')
+    op.drop_index('ix_time_records_active_worker', table_name='time_records')
+    op.drop_index('ix_time_records_clock_in', table_name='time_records')
+    op.drop_index('ix_time_records_worker_status', table_name='time_records')
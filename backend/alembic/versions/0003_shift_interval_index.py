@@ -0,0 +1,25 @@
+"""Index for shift interval overlap checks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built it on a fresh database
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('shifts')}
+    if 'ix_shifts_worker_interval' not in existing:
+        op.create_index('ix_shifts_worker_interval', 'shifts', ['worker_id', 'start_time', 'end_time'])
+
+
+def downgrade():
+    op.drop_index('ix_shifts_worker_interval', table_name='shifts')
@@ -0,0 +1,46 @@
+"""Recurrence end date and per-occurrence overrides for recurring shifts
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built these on a fresh database
+    inspector = sa.inspect(op.get_bind())
+
+    if 'recurrence_end' not in {column['name'] for column in inspector.get_columns('shifts')}:
+        with op.batch_alter_table('shifts') as batch_op:
+            batch_op.add_column(sa.Column('recurrence_end', sa.DateTime(), nullable=True))
+
+    if not inspector.has_table('shift_overrides'):
+        op.create_table(
+            'shift_overrides',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('shift_id', sa.Integer(), sa.ForeignKey('shifts.id'), nullable=False),
+            sa.Column('occurrence_date', sa.Date(), nullable=False),
+            sa.Column('start_time', sa.DateTime(), nullable=True),
+            sa.Column('end_time', sa.DateTime(), nullable=True),
+            sa.Column('status', sa.String(20), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+            sa.UniqueConstraint('shift_id', 'occurrence_date', name='uq_shift_overrides_occurrence'),
+        )
+        op.create_index('ix_shift_overrides_id', 'shift_overrides', ['id'])
+
+
+def downgrade():
+    op.drop_index('ix_shift_overrides_id', table_name='shift_overrides')
+    op.drop_table('shift_overrides')
+    with op.batch_alter_table('shifts') as batch_op:
+        batch_op.drop_column('recurrence_end')
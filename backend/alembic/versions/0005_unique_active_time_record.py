@@ -0,0 +1,49 @@
+"""Make the active time record index unique
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status = 'active'")
+
+
+def _create_index(unique):
+    op.create_index(
+        'ix_time_records_active_worker', 'time_records', ['worker_id'], unique=unique,
+        sqlite_where=ACTIVE, postgresql_where=ACTIVE
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = {index['name']: index for index in sa.inspect(bind).get_indexes('time_records')}
+    if existing.get('ix_time_records_active_worker', {}).get('unique'):
+        return
+
+    duplicates = bind.execute(sa.text(
+        "SELECT worker_id FROM time_records WHERE status = 'active' "
+        "GROUP BY worker_id HAVING COUNT(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Workers with more than one active time record, clock them out first: "
+            + ", ".join(str(worker_id) for worker_id in duplicates)
+        )
+
+    if 'ix_time_records_active_worker' in existing:
+        op.drop_index('ix_time_records_active_worker', table_name='time_records')
+    _create_index(unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_time_records_active_worker', table_name='time_records')
+    _create_index(unique=False)
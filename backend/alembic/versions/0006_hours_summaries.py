@@ -0,0 +1,35 @@
+"""Hours summary table for reports
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built it on a fresh database; rows are
+    # filled in by ensure_rollups() on the next application start
+    if not sa.inspect(op.get_bind()).has_table('hours_summaries'):
+        op.create_table(
+            'hours_summaries',
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('worker_id', sa.Integer(), sa.ForeignKey('workers.id'), primary_key=True),
+            sa.Column('position', sa.String(100), primary_key=True),
+            sa.Column('week_start', sa.Date(), nullable=False),
+            sa.Column('month_start', sa.Date(), nullable=False),
+            sa.Column('record_count', sa.Integer(), nullable=False),
+            sa.Column('total_hours', sa.Float(), nullable=False),
+            sa.Column('overtime_hours', sa.Float(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('hours_summaries')
@@ -0,0 +1,40 @@
+"""Background jobs table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built it on a fresh database
+    if not sa.inspect(op.get_bind()).has_table('jobs'):
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('kind', sa.String(50), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('result', sa.Text()),
+            sa.Column('error', sa.Text()),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('processed_rows', sa.Integer(), nullable=False),
+            sa.Column('total_rows', sa.Integer()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('started_at', sa.DateTime()),
+            sa.Column('finished_at', sa.DateTime()),
+        )
+        op.create_index('ix_jobs_id', 'jobs', ['id'])
+        op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'])
+
+
+def downgrade():
+    op.drop_table('jobs')
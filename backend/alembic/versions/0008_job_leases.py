@@ -0,0 +1,30 @@
+"""Lease columns for background jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built these on a fresh database
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('jobs')}
+    with op.batch_alter_table('jobs') as batch_op:
+        if 'owner' not in columns:
+            batch_op.add_column(sa.Column('owner', sa.String(32), nullable=True))
+        if 'heartbeat_at' not in columns:
+            batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('owner')
@@ -0,0 +1,25 @@
+"""Index for looking up recurring shift templates
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_all() may already have built it on a fresh database
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('shifts')}
+    if 'ix_shifts_recurring_date' not in existing:
+        op.create_index('ix_shifts_recurring_date', 'shifts', ['is_recurring', 'date'])
+
+
+def downgrade():
+    op.drop_index('ix_shifts_recurring_date', table_name='shifts')
@@ -0,0 +1,11 @@
+"""Helpers for splitting large id and row lists into bounded batches."""
+from typing import Iterable, List
+
+# Keep IN lists well below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def chunks(items: List, size: int) -> Iterable[List]:
+    """Yield consecutive slices of ``items`` holding at most ``size`` each"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
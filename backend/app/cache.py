@@ -0,0 +1,158 @@
+"""In-process response cache with ETags for read-heavy endpoints.
+
+Cached endpoints serialise their response once and keep the JSON body, keyed
+by path, query parameters and the version of every data scope the response
+depends on. Write handlers bump the versions of the scopes they change, so
+later lookups miss and old entries age out of the LRU. Entries also expire
+after ``RESPONSE_CACHE_TTL`` seconds, which bounds how long writes made by
+other server processes, or the date changing at midnight, go unnoticed.
+
+Every response carries a strong ``ETag``; a request whose ``If-None-Match``
+matches it gets an empty ``304 Not Modified``.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# Seconds a cached response is served, 0 disables the cache
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+# Most responses kept, least recently used are evicted first
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# Data scopes bumped by the write handlers
+WORKERS = "workers"
+SHIFTS = "shifts"
+TIME_RECORDS = "time_records"
+ALL_SCOPES = (WORKERS, SHIFTS, TIME_RECORDS)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "headers", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, headers: Dict[str, str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.expires_at = expires_at
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+def _respond(request: Request, cached: CachedResponse) -> Response:
+    headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+class CacheLookup:
+    """Outcome of a lookup; ``response`` is set on a hit"""
+
+    def __init__(self, cache: "ResponseCache", request: Request, key: Optional[Hashable], response: Optional[Response]):
+        self._cache = cache
+        self._request = request
+        self._key = key
+        self.response = response
+
+    def store(self, adapter: TypeAdapter, content: Any, response: Optional[Response] = None) -> Response:
+        """Serialise ``content`` with ``adapter``, cache it and build the response
+
+        Headers already set on the handler's ``response``, such as the next
+        page cursor, are kept with the cached body.
+        """
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        headers = dict(response.headers) if response is not None else {}
+        cached = CachedResponse(body, _etag(body), headers, time.monotonic() + self._cache.ttl)
+        if self._key is not None:
+            self._cache._put(self._key, cached)
+        return _respond(self._request, cached)
+
+
+class ResponseCache:
+    """TTL and LRU bounded cache of serialised responses, shared by the request threads"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._versions: Dict[str, int] = {scope: 0 for scope in ALL_SCOPES}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def bump(self, *scopes: str):
+        """Invalidate cached responses depending on ``scopes``, all of them by default"""
+        with self._lock:
+            for scope in scopes or ALL_SCOPES:
+                self._versions[scope] += 1
+
+    def _key(self, request: Request, scopes: Sequence[str]) -> Tuple:
+        # Versions are read before the handler queries, so a write committed
+        # meanwhile can only make the stored body newer than its key
+        return (
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items())),
+            tuple(self._versions[scope] for scope in scopes)
+        )
+
+    def lookup(self, request: Request, scopes: Sequence[str]) -> CacheLookup:
+        """Find the cached response for ``request``, valid while ``scopes`` are unchanged"""
+        if not self.enabled:
+            return CacheLookup(self, request, None, None)
+
+        with self._lock:
+            key = self._key(request, scopes)
+            cached = self._entries.get(key)
+            if cached is not None and cached.expires_at <= time.monotonic():
+                del self._entries[key]
+                cached = None
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        return CacheLookup(self, request, key, _respond(request, cached) if cached else None)
+
+    def _put(self, key: Hashable, cached: CachedResponse):
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "versions": dict(self._versions)
+            }
+
+
+response_cache = ResponseCache()
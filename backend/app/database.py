@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,19 +10,108 @@ load_dotenv()
 # Database URL - defaults to SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./shifts_tracker.db")
 
+# Connection pool settings (PostgreSQL and file-based SQLite). Keep
+# DB_POOL_SIZE + DB_MAX_OVERFLOW at least THREADPOOL_SIZE: sync handlers and
+# the session teardown share those threads, so a smaller pool can stall
+# requests until DB_POOL_TIMEOUT
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# SQLite pragmas applied to every new connection. WAL lets readers run
+# alongside the single writer, and busy_timeout makes concurrent writers wait
+# for the lock instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative means KiB, i.e. 64 MiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))  # bytes, 256 MiB
+
+# Async database layer. When enabled, the async route handlers in
+# app.routers.async_api take over the hot endpoints and run on the event loop
+# instead of the threadpool. aiosqlite, for SQLite, is in requirements.txt;
+# PostgreSQL needs asyncpg installed as well.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Threads available to sync route handlers (Starlette's default is 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+def _async_database_url(url: str) -> str:
+    """Derive the async driver URL from a sync DATABASE_URL"""
+    scheme, _, rest = url.partition("://")
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+def _is_file_sqlite(url: str) -> bool:
+    # In-memory databases use a single shared connection, not a pool
+    return ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite+aiosqlite:")
+
+def _pool_options():
+    return dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
+
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000},
+        **(_pool_options() if _is_file_sqlite(DATABASE_URL) else {})
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **_pool_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Create async engine only when enabled, so it holds no connections otherwise
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT / 1000},
+            **(_pool_options() if _is_file_sqlite(ASYNC_DATABASE_URL) else {})
+        )
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    else:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options())
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, ForeignKey, Text, Float, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -31,6 +31,7 @@ class Shift(Base):
     end_time = Column(DateTime, nullable=False)
     is_recurring = Column(Boolean, default=False)
     recurrence_pattern = Column(String(50))  # daily, weekly, monthly
+    recurrence_end = Column(DateTime, nullable=True)  # last day of a recurring shift, open-ended if null
     status = Column(String(20), default="scheduled")  # scheduled, completed, cancelled
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -39,6 +40,39 @@ class Shift(Base):
     # Relationships
     worker = relationship("Worker", back_populates="shifts")
     time_records = relationship("TimeRecord", back_populates="shift")
+    overrides = relationship("ShiftOverride", back_populates="shift", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Overlap checks and upcoming shifts per worker
+        Index("ix_shifts_worker_date_status", "worker_id", "date", "status"),
+        # Today's shifts
+        Index("ix_shifts_date", "date"),
+        # Interval overlap checks
+        Index("ix_shifts_worker_interval", "worker_id", "start_time", "end_time"),
+        # Recurring templates whose series has started by a date
+        Index("ix_shifts_recurring_date", "is_recurring", "date"),
+    )
+
+class ShiftOverride(Base):
+    __tablename__ = "shift_overrides"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    shift_id = Column(Integer, ForeignKey("shifts.id"), nullable=False)
+    occurrence_date = Column(Date, nullable=False)
+    # Null fields keep the recurring shift's values
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    status = Column(String(20), nullable=True)
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    shift = relationship("Shift", back_populates="overrides")
+    
+    __table_args__ = (
+        UniqueConstraint("shift_id", "occurrence_date", name="uq_shift_overrides_occurrence"),
+    )
 
 class TimeRecord(Base):
     __tablename__ = "time_records"
@@ -60,6 +94,21 @@ class TimeRecord(Base):
     # Relationships
     worker = relationship("Worker", back_populates="time_records")
     shift = relationship("Shift", back_populates="time_records")
+    
+    __table_args__ = (
+        # Per-worker record lookups filtered by status
+        Index("ix_time_records_worker_status", "worker_id", "status"),
+        # Date range filters on dashboard, reports and exports
+        Index("ix_time_records_clock_in", "clock_in"),
+        # Only currently clocked-in records, kept small by the partial predicate.
+        # Unique, so a worker can never hold two active records
+        Index(
+            "ix_time_records_active_worker", "worker_id",
+            unique=True,
+            sqlite_where=text("status = 'active'"),
+            postgresql_where=text("status = 'active'")
+        ),
+    )
 
 class Holiday(Base):
     __tablename__ = "holidays"
@@ -68,4 +117,53 @@ class Holiday(Base):
     name = Column(String(100), nullable=False)
     date = Column(DateTime, nullable=False)
     is_recurring = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    clock_ins = Column(Integer, nullable=False, default=0)
+    total_hours = Column(Float, nullable=False, default=0.0)
+    overtime_hours = Column(Float, nullable=False, default=0.0)
+
+class HoursSummary(Base):
+    __tablename__ = "hours_summaries"
+    
+    day = Column(Date, primary_key=True)
+    worker_id = Column(Integer, ForeignKey("workers.id"), primary_key=True)
+    position = Column(String(100), primary_key=True)  # Worker's position at clock-out, '' if none
+    week_start = Column(Date, nullable=False)  # Monday of the day's week
+    month_start = Column(Date, nullable=False)
+    record_count = Column(Integer, nullable=False, default=0)
+    total_hours = Column(Float, nullable=False, default=0.0)
+    overtime_hours = Column(Float, nullable=False, default=0.0)
+
+class StatsCounter(Base):
+    __tablename__ = "stats_counters"
+    
+    name = Column(String(50), primary_key=True)  # total_workers, active_workers, workers_clocked_in
+    value = Column(Integer, nullable=False, default=0)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # sheets_export, sheets_import, csv_upload
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(Text, nullable=False)  # JSON arguments, including uploaded file contents
+    result = Column(Text)  # JSON outcome: row counts and per-row errors
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    owner = Column(String(32))  # Process holding the lease of a running job
+    heartbeat_at = Column(DateTime)  # Last lease renewal
+    
+    __table_args__ = (
+        # Workers pick the oldest queued job
+        Index("ix_jobs_status_id", "status", "id"),
+    )
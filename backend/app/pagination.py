@@ -0,0 +1,65 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Listings are ordered by a unique key such as ``(clock_in, id)`` and a page
+starts right after the last key of the previous one, so every page costs an
+index seek rather than scanning and discarding the rows before it. Cursors are
+opaque to clients; the next one is returned in the ``X-Next-Cursor`` header
+and is absent on the last page.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Date, DateTime, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode key values as an opaque cursor"""
+    plain = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """Decode a cursor back into typed key values for ``columns``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of key values")
+        typed = []
+        for column, value in zip(columns, values):
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+            typed.append(value)
+        return typed
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(columns: Sequence, values: Sequence[Any]):
+    """Build ``(c1, c2, ...) > (v1, v2, ...)`` as a row value comparison, which
+    the index on the leading column can seek to, unlike the expanded OR form"""
+    if len(columns) == 1:
+        return columns[0] > values[0]
+    return tuple_(*columns) > tuple_(*values, types=[column.type for column in columns])
+
+
+def keyset(query, columns: Sequence, cursor: Optional[str]):
+    """Order ``query`` by ``columns`` and start after ``cursor``"""
+    query = query.order_by(*columns)
+    if cursor:
+        query = query.where(_after(columns, decode_cursor(cursor, columns)))
+    return query
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, attributes: Sequence[str]):
+    """Set the next cursor header when ``items`` filled the page"""
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, name) for name in attributes])
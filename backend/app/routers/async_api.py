@@ -0,0 +1,137 @@
+"""Async versions of the most frequently hit handlers.
+
+Mounted ahead of the sync routers when ``DB_ASYNC`` is enabled, so these
+paths run on the event loop with an ``AsyncSession`` instead of occupying a
+threadpool slot per request. The remaining endpoints keep their sync handlers.
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, date
+from app.database import get_async_db
+from app import models, schemas
+from app.cache import WORKERS, response_cache
+from app.routers.shifts import (
+    shifts_query, shift_rows_query, list_shifts, list_shift_rows, list_today_shifts,
+    SHIFT_LIST, SHIFT_LIST_SCOPES, SHIFT_PAGE_KEY, SHIFT_ROW
+)
+from app.routers.tracking import EXPAND_DESCRIPTION, record_load_options
+from app.routers.workers import WORKER_LIST, WORKER_PAGE_KEY
+from app.pagination import keyset, set_next_cursor
+from app.serialization import FAST_DESCRIPTION, json_response
+from app.services import clock_service, rollup_service
+
+workers_router = APIRouter()
+shifts_router = APIRouter()
+tracking_router = APIRouter()
+
+@workers_router.get("/", response_model=List[schemas.Worker])
+async def get_workers(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all workers"""
+    cached = response_cache.lookup(request, (WORKERS,))
+    if cached.response is not None:
+        return cached.response
+
+    query = keyset(select(models.Worker), WORKER_PAGE_KEY, cursor)
+    workers = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
+    set_next_cursor(response, workers, limit, ["id"])
+    return cached.store(WORKER_LIST, workers, response)
+
+@shifts_router.get("/", response_model=List[schemas.Shift])
+async def get_shifts(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    worker_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    status: Optional[str] = Query(None),
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get shifts with optional filtering"""
+    if fast:
+        if date_from and date_to:
+            rows = await db.run_sync(
+                lambda session: list_shift_rows(session, skip, limit, cursor, worker_id, date_from, date_to, status)
+            )
+        else:
+            query = keyset(shift_rows_query(worker_id, date_from, date_to, status), SHIFT_PAGE_KEY, cursor)
+            rows = (await db.execute(query.offset(skip).limit(limit))).all()
+        set_next_cursor(response, rows, limit, ["date", "id"])
+        return json_response(SHIFT_ROW.dump(rows), response)
+
+    if date_from and date_to:
+        # Recurring shift expansion is plain Python over a sync session
+        shifts = await db.run_sync(
+            lambda session: list_shifts(session, skip, limit, cursor, worker_id, date_from, date_to, status)
+        )
+    else:
+        query = keyset(shifts_query(worker_id, date_from, date_to, status), SHIFT_PAGE_KEY, cursor)
+        shifts = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
+    set_next_cursor(response, shifts, limit, ["date", "id"])
+    return shifts
+
+@shifts_router.get("/today/", response_model=List[schemas.Shift])
+async def get_today_shifts(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get all shifts for today"""
+    cached = response_cache.lookup(request, SHIFT_LIST_SCOPES)
+    if cached.response is not None:
+        return cached.response
+    return cached.store(SHIFT_LIST, await db.run_sync(list_today_shifts))
+
+@tracking_router.post("/clock-in", response_model=schemas.TimeRecord, status_code=status.HTTP_201_CREATED)
+async def clock_in(
+    time_record: schemas.TimeRecordCreate,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Clock in a worker"""
+    options = record_load_options(expand)
+
+    if clock_service.CLOCK_IN_BATCH_MS > 0:
+        row = await asyncio.wrap_future(clock_service.get_clock_in_writer().submit(
+            time_record.worker_id, time_record.shift_id, time_record.notes
+        ))
+    else:
+        # One conditional insert checks the worker exists and is not clocked in
+        try:
+            row = (await db.execute(clock_service.clock_in_statement(
+                time_record.worker_id, time_record.shift_id, time_record.notes, datetime.now()
+            ))).first()
+            if row is not None:
+                await db.run_sync(lambda session: rollup_service.record_clock_in(session, row))
+                workers = await db.run_sync(lambda session: clock_service.event_workers(session, [row.worker_id]))
+            await db.commit()
+            if row is not None:
+                clock_service.clocked_in(row, workers[row.worker_id])
+        except IntegrityError:
+            await db.rollback()
+            row = None
+
+    if row is None:
+        status_code, detail = await db.run_sync(
+            lambda session: clock_service.clock_in_error(session, time_record.worker_id)
+        )
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    if not expand:
+        return dict(row._mapping)
+
+    # Lazy loading is not available on an AsyncSession, load the requested relations up front
+    result = await db.execute(
+        select(models.TimeRecord).options(*options).where(models.TimeRecord.id == row.id)
+    )
+    return result.scalar_one()
@@ -1,55 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
+import asyncio
 import io
 from datetime import datetime, date
 from app.database import get_db
 from app import models, schemas
-from app.services.google_sheets_service import GoogleSheetsService
+from app.services.google_sheets_service import get_google_sheets_service, invalidate_google_sheets_service
+from app.services import export_service, import_service
+from app.services.job_service import JobProgress, job_queue
 
 router = APIRouter()
 
+# Background job kinds
+SHEETS_EXPORT_JOB = "sheets_export"
+SHEETS_IMPORT_JOB = "sheets_import"
+CSV_UPLOAD_JOB = "csv_upload"
+
+BACKGROUND_DESCRIPTION = "Queue a background job and return it at once; poll /api/jobs/{id} for the outcome"
+
+def _collect_export_records(db: Session, export_data: schemas.GoogleSheetsExport) -> List[Dict[str, Any]]:
+    """Load the time records selected for a Google Sheets export"""
+    query = db.query(models.TimeRecord).join(models.Worker)
+    
+    if export_data.worker_ids:
+        query = query.filter(models.TimeRecord.worker_id.in_(export_data.worker_ids))
+    
+    if export_data.date_from:
+        query = query.filter(models.TimeRecord.clock_in >= export_data.date_from)
+    
+    if export_data.date_to:
+        query = query.filter(models.TimeRecord.clock_in <= export_data.date_to)
+    
+    records = query.all()
+    
+    # Prepare data for export
+    export_records = []
+    for record in records:
+        export_records.append({
+            'Worker Name': record.worker.name,
+            'Worker Email': record.worker.email,
+            'Position': record.worker.position,
+            'Clock In': record.clock_in.strftime('%Y-%m-%d %H:%M:%S') if record.clock_in else '',
+            'Clock Out': record.clock_out.strftime('%Y-%m-%d %H:%M:%S') if record.clock_out else '',
+            'Break Start': record.break_start.strftime('%Y-%m-%d %H:%M:%S') if record.break_start else '',
+            'Break End': record.break_end.strftime('%Y-%m-%d %H:%M:%S') if record.break_end else '',
+            'Total Hours': record.total_hours or 0,
+            'Overtime Hours': record.overtime_hours or 0,
+            'Status': record.status,
+            'Notes': record.notes or ''
+        })
+    return export_records
+
+def _run_sheets_export(db: Session, payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    export_data = schemas.GoogleSheetsExport(**payload)
+    export_records = _collect_export_records(db, export_data)
+    progress(0, len(export_records))
+    
+    result = asyncio.run(get_google_sheets_service().export_data(
+        data=export_records,
+        spreadsheet_id=export_data.spreadsheet_id,
+        sheet_name=export_data.sheet_name,
+        # Counts include the header row
+        progress=lambda written, total: progress(written - 1, total - 1)
+    ))
+    return {
+        "spreadsheet_id": result.get("spreadsheet_id"),
+        "sheet_url": result.get("sheet_url"),
+        "records_exported": len(export_records)
+    }
+
+def _run_sheets_import(db: Session, payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    import_data = schemas.GoogleSheetsImport(**payload)
+    data = asyncio.run(get_google_sheets_service().import_data(
+        spreadsheet_id=import_data.spreadsheet_id,
+        sheet_name=import_data.sheet_name,
+        range_name=import_data.range_name
+    ))
+    imported_count, errors = import_service.import_time_records(db, data, progress=progress)
+    return {"imported_count": imported_count, "errors": errors}
+
+def _import_csv(db: Session, contents: str, progress: Optional[JobProgress] = None) -> Tuple[int, List[str]]:
+    """Parse an uploaded workers CSV and import it"""
+    df = pd.read_csv(io.StringIO(contents))
+    return import_service.import_workers_csv(db, df, progress=progress)
+
+def _run_csv_upload(db: Session, payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    imported_count, errors = _import_csv(db, payload["csv"], progress)
+    return {"imported_count": imported_count, "errors": errors}
+
+job_queue.register(SHEETS_EXPORT_JOB, _run_sheets_export)
+job_queue.register(SHEETS_IMPORT_JOB, _run_sheets_import)
+job_queue.register(CSV_UPLOAD_JOB, _run_csv_upload)
+
+async def _submit(db: Session, kind: str, payload: Dict[str, Any]) -> JSONResponse:
+    job = await run_in_threadpool(job_queue.submit, db, kind, payload)
+    status_data = await run_in_threadpool(job_queue.status, db, job.id)
+    return JSONResponse(
+        jsonable_encoder(schemas.Job(**status_data)),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
 @router.post("/export")
 async def export_to_google_sheets(
     export_data: schemas.GoogleSheetsExport,
+    background: bool = Query(False, description=BACKGROUND_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """Export shift data to Google Sheets"""
+    if background:
+        return await _submit(db, SHEETS_EXPORT_JOB, export_data.model_dump(mode="json"))
+    
     try:
-        # Get data based on filters
-        query = db.query(models.TimeRecord).join(models.Worker)
-        
-        if export_data.worker_ids:
-            query = query.filter(models.TimeRecord.worker_id.in_(export_data.worker_ids))
-        
-        if export_data.date_from:
-            query = query.filter(models.TimeRecord.clock_in >= export_data.date_from)
-        
-        if export_data.date_to:
-            query = query.filter(models.TimeRecord.clock_in <= export_data.date_to)
-        
-        records = query.all()
-        
-        # Prepare data for export
-        export_records = []
-        for record in records:
-            export_records.append({
-                'Worker Name': record.worker.name,
-                'Worker Email': record.worker.email,
-                'Position': record.worker.position,
-                'Clock In': record.clock_in.strftime('%Y-%m-%d %H:%M:%S') if record.clock_in else '',
-                'Clock Out': record.clock_out.strftime('%Y-%m-%d %H:%M:%S') if record.clock_out else '',
-                'Break Start': record.break_start.strftime('%Y-%m-%d %H:%M:%S') if record.break_start else '',
-                'Break End': record.break_end.strftime('%Y-%m-%d %H:%M:%S') if record.break_end else '',
-                'Total Hours': record.total_hours or 0,
-                'Overtime Hours': record.overtime_hours or 0,
-                'Status': record.status,
-                'Notes': record.notes or ''
-            })
+        # Database work is blocking, keep it off the event loop
+        export_records = await run_in_threadpool(_collect_export_records, db, export_data)
         
         # Use Google Sheets service to export
-        sheets_service = GoogleSheetsService()
+        sheets_service = get_google_sheets_service()
         result = await sheets_service.export_data(
             data=export_records,
             spreadsheet_id=export_data.spreadsheet_id,
@@ -69,71 +141,22 @@ async def export_to_google_sheets(
 @router.post("/import")
 async def import_from_google_sheets(
     import_data: schemas.GoogleSheetsImport,
+    background: bool = Query(False, description=BACKGROUND_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """Import shift data from Google Sheets"""
+    if background:
+        return await _submit(db, SHEETS_IMPORT_JOB, import_data.model_dump(mode="json"))
+    
     try:
-        sheets_service = GoogleSheetsService()
+        sheets_service = get_google_sheets_service()
         data = await sheets_service.import_data(
             spreadsheet_id=import_data.spreadsheet_id,
             sheet_name=import_data.sheet_name,
             range_name=import_data.range_name
         )
         
-        imported_count = 0
-        errors = []
-        
-        for row_data in data:
-            try:
-                # Find or create worker
-                worker_email = row_data.get('Worker Email')
-                if not worker_email:
-                    errors.append(f"Missing worker email in row: {row_data}")
-                    continue
-                
-                worker = db.query(models.Worker).filter(
-                    models.Worker.email == worker_email
-                ).first()
-                
-                if not worker:
-                    # Create new worker
-                    worker = models.Worker(
-                        name=row_data.get('Worker Name', ''),
-                        email=worker_email,
-                        position=row_data.get('Position', '')
-                    )
-                    db.add(worker)
-                    db.commit()
-                    db.refresh(worker)
-                
-                # Create time record
-                clock_in_str = row_data.get('Clock In')
-                if clock_in_str:
-                    clock_in = datetime.strptime(clock_in_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    # Check if record already exists
-                    existing_record = db.query(models.TimeRecord).filter(
-                        models.TimeRecord.worker_id == worker.id,
-                        models.TimeRecord.clock_in == clock_in
-                    ).first()
-                    
-                    if not existing_record:
-                        time_record = models.TimeRecord(
-                            worker_id=worker.id,
-                            clock_in=clock_in,
-                            clock_out=datetime.strptime(row_data.get('Clock Out'), '%Y-%m-%d %H:%M:%S') if row_data.get('Clock Out') else None,
-                            total_hours=float(row_data.get('Total Hours', 0)),
-                            overtime_hours=float(row_data.get('Overtime Hours', 0)),
-                            status=row_data.get('Status', 'completed'),
-                            notes=row_data.get('Notes', '')
-                        )
-                        db.add(time_record)
-                        imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Error processing row {row_data}: {str(e)}")
-        
-        db.commit()
+        imported_count, errors = await run_in_threadpool(import_service.import_time_records, db, data)
         
         return {
             "message": "Import completed",
@@ -144,48 +167,35 @@ async def import_from_google_sheets(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
+@router.post("/reload-credentials")
+def reload_google_credentials():
+    """Drop the cached Google Sheets client so credentials are read again"""
+    invalidate_google_sheets_service()
+    return {"message": "Google Sheets credentials will be reloaded on next use"}
+
 @router.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_csv(
+    file: UploadFile = File(...),
+    background: bool = Query(False, description=BACKGROUND_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Upload and import data from CSV file"""
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
+    if background:
+        try:
+            # Kept in the job so it can be run again after a crash
+            contents = (await file.read()).decode('utf-8')
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+        return await _submit(db, CSV_UPLOAD_JOB, {"filename": file.filename, "csv": contents})
+    
     try:
         contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                # Find or create worker
-                worker_email = row.get('Worker Email') or row.get('email')
-                if pd.isna(worker_email):
-                    errors.append(f"Missing worker email in row {index + 1}")
-                    continue
-                
-                worker = db.query(models.Worker).filter(
-                    models.Worker.email == worker_email
-                ).first()
-                
-                if not worker:
-                    worker = models.Worker(
-                        name=row.get('Worker Name') or row.get('name', ''),
-                        email=worker_email,
-                        position=row.get('Position') or row.get('position', ''),
-                        hourly_rate=float(row.get('Hourly Rate') or row.get('hourly_rate', 0))
-                    )
-                    db.add(worker)
-                    db.commit()
-                    db.refresh(worker)
-                
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Error processing row {index + 1}: {str(e)}")
         
-        db.commit()
+        # Parsing and importing are blocking, keep them off the event loop
+        imported_count, errors = await run_in_threadpool(_import_csv, db, contents.decode('utf-8'))
         
         return {
             "message": "CSV imported successfully",
@@ -196,52 +206,76 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"CSV import failed: {str(e)}")
 
+def _build_csv(db: Session, worker_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> str:
+    """Render the selected time records as CSV text"""
+    query = db.query(models.TimeRecord).join(models.Worker)
+    
+    if worker_id:
+        query = query.filter(models.TimeRecord.worker_id == worker_id)
+    
+    if date_from:
+        query = query.filter(models.TimeRecord.clock_in >= date_from)
+    
+    if date_to:
+        query = query.filter(models.TimeRecord.clock_in <= date_to)
+    
+    records = query.all()
+    
+    # Prepare data for CSV
+    csv_data = []
+    for record in records:
+        csv_data.append({
+            'Worker Name': record.worker.name,
+            'Worker Email': record.worker.email,
+            'Position': record.worker.position,
+            'Hourly Rate': record.worker.hourly_rate,
+            'Clock In': record.clock_in.strftime('%Y-%m-%d %H:%M:%S') if record.clock_in else '',
+            'Clock Out': record.clock_out.strftime('%Y-%m-%d %H:%M:%S') if record.clock_out else '',
+            'Total Hours': record.total_hours or 0,
+            'Overtime Hours': record.overtime_hours or 0,
+            'Status': record.status,
+            'Notes': record.notes or ''
+        })
+    
+    # Convert to CSV
+    df = pd.DataFrame(csv_data)
+    csv_buffer = io.StringIO()
+    df.to_csv(csv_buffer, index=False)
+    return csv_buffer.getvalue()
+
 @router.get("/export-csv")
 async def export_to_csv(
     worker_id: int = None,
     date_from: date = None,
     date_to: date = None,
+    stream: bool = False,
+    format: schemas.ExportFormat = schemas.ExportFormat.CSV,
     db: Session = Depends(get_db)
 ):
-    """Export data to CSV format"""
+    """Export data to CSV, Parquet, Arrow or XLSX format
+    
+    With ``stream=true``, and always for the other formats, the export is
+    sent as an attachment written in chunks from a database cursor, so memory
+    use stays flat regardless of the number of records.
+    """
+    media_type, extension = export_service.FORMATS[format.value]
+    filename = f"shifts_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    
+    if stream or format != schemas.ExportFormat.CSV:
+        # A sync generator is iterated in the threadpool, keeping the event loop free
+        return StreamingResponse(
+            export_service.EXPORTERS[format.value](worker_id, date_from, date_to),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
     try:
-        query = db.query(models.TimeRecord).join(models.Worker)
-        
-        if worker_id:
-            query = query.filter(models.TimeRecord.worker_id == worker_id)
-        
-        if date_from:
-            query = query.filter(models.TimeRecord.clock_in >= date_from)
-        
-        if date_to:
-            query = query.filter(models.TimeRecord.clock_in <= date_to)
-        
-        records = query.all()
-        
-        # Prepare data for CSV
-        csv_data = []
-        for record in records:
-            csv_data.append({
-                'Worker Name': record.worker.name,
-                'Worker Email': record.worker.email,
-                'Position': record.worker.position,
-                'Hourly Rate': record.worker.hourly_rate,
-                'Clock In': record.clock_in.strftime('%Y-%m-%d %H:%M:%S') if record.clock_in else '',
-                'Clock Out': record.clock_out.strftime('%Y-%m-%d %H:%M:%S') if record.clock_out else '',
-                'Total Hours': record.total_hours or 0,
-                'Overtime Hours': record.overtime_hours or 0,
-                'Status': record.status,
-                'Notes': record.notes or ''
-            })
-        
-        # Convert to CSV
-        df = pd.DataFrame(csv_data)
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
+        # Database work and CSV formatting are blocking, keep them off the event loop
+        csv_data = await run_in_threadpool(_build_csv, db, worker_id, date_from, date_to)
         
         return {
-            "csv_data": csv_buffer.getvalue(),
-            "filename": f"shifts_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            "csv_data": csv_data,
+            "filename": filename
         }
         
     except Exception as e:
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date, timedelta
+from app.database import get_db
+from app import schemas
+from app.services import payroll_service, rollup_service
+
+router = APIRouter()
+
+def month_bounds(day: date):
+    """First and last day of the month containing ``day``"""
+    first = day.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+@router.get("/payroll", response_model=schemas.PayrollReport)
+def get_payroll(
+    period_start: Optional[date] = Query(None, description="First day of the pay period, default the 1st of this month"),
+    period_end: Optional[date] = Query(None, description="Last day of the pay period, default the end of period_start's month"),
+    worker_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get hours, overtime, holiday premiums and gross pay per worker for a pay period"""
+    if period_start is None:
+        period_start = date.today().replace(day=1)
+    if period_end is None:
+        period_end = month_bounds(period_start)[1]
+    if period_end < period_start:
+        raise HTTPException(status_code=400, detail="period_end must not be before period_start")
+    
+    return payroll_service.payroll_report(db, period_start, period_end, worker_id)
+
+@router.get("/summary", response_model=List[schemas.HoursSummaryRow])
+def get_hours_summary(
+    date_from: Optional[date] = Query(None, description="First day, default the 1st of this month"),
+    date_to: Optional[date] = Query(None, description="Last day, default the end of date_from's month"),
+    period: schemas.SummaryPeriod = Query(schemas.SummaryPeriod.WEEK),
+    group_by: schemas.SummaryGroup = Query(schemas.SummaryGroup.POSITION),
+    position: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get completed hours, overtime and record counts per day, week or month by position or worker"""
+    if date_from is None:
+        date_from = date.today().replace(day=1)
+    if date_to is None:
+        date_to = month_bounds(date_from)[1]
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    
+    return rollup_service.get_hours_summary(db, date_from, date_to, period, group_by, position)
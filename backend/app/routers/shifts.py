@@ -1,38 +1,155 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased, joinedload
 from typing import List, Optional
 from datetime import datetime, date
 from app.database import get_db
 from app import models, schemas
+from app.cache import SHIFTS, WORKERS, response_cache
+from app.pagination import decode_cursor, keyset, set_next_cursor
+from app.serialization import FAST_DESCRIPTION, RowShape, json_response
+from app.services import shift_service
+from app.services.event_service import SHIFT_STATUS, event_hub
 
 router = APIRouter()
 
+# Keyset pagination order
+SHIFT_PAGE_KEY = (models.Shift.date, models.Shift.id)
+
+SHIFT_LIST = TypeAdapter(List[schemas.Shift])
+# Shifts embed their worker
+SHIFT_LIST_SCOPES = (SHIFTS, WORKERS)
+
+SHIFT_ROW = RowShape(schemas.Shift, models.Shift, {"worker": RowShape(schemas.Worker, aliased(models.Worker))})
+
+def shift_filters(
+    worker_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    templates: bool = True
+) -> List:
+    """Conditions of the shift listing filters"""
+    filters = []
+    
+    if worker_id:
+        filters.append(models.Shift.worker_id == worker_id)
+    
+    # Compare with datetimes, shift dates are stored with a time part
+    if date_from:
+        filters.append(models.Shift.date >= shift_service.day_bounds(date_from, date_from)[0])
+    
+    if date_to:
+        filters.append(models.Shift.date < shift_service.day_bounds(date_to, date_to)[1])
+    
+    if not templates:
+        filters.append(~shift_service.TEMPLATE_FILTER)
+    
+    if status:
+        filters.append(models.Shift.status == status)
+    
+    return filters
+
+def shifts_query(
+    worker_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    templates: bool = True
+):
+    """Build the shift listing statement, shared by the sync and async handlers"""
+    return select(models.Shift).options(joinedload(models.Shift.worker)).where(
+        *shift_filters(worker_id, date_from, date_to, status, templates)
+    )
+
+def shift_rows_query(
+    worker_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    templates: bool = True
+):
+    """Build the shift listing statement selecting column rows for the fast path"""
+    return SHIFT_ROW.select().where(*shift_filters(worker_id, date_from, date_to, status, templates))
+
+def today_shifts_query():
+    """Build the statement for today's stored, non-recurring shifts"""
+    day_start, day_end = shift_service.day_bounds(date.today(), date.today())
+    return select(models.Shift).options(joinedload(models.Shift.worker)).where(
+        models.Shift.date >= day_start,
+        models.Shift.date < day_end,
+        ~shift_service.TEMPLATE_FILTER
+    ).order_by(*SHIFT_PAGE_KEY)
+
+def list_shifts(
+    db: Session,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    worker_id: Optional[int],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    status: Optional[str]
+):
+    """Return a page of shifts, expanding recurring shifts when a window is given"""
+    if date_from and date_to:
+        query = keyset(shifts_query(worker_id, date_from, date_to, status, templates=False), SHIFT_PAGE_KEY, cursor)
+        after = decode_cursor(cursor, SHIFT_PAGE_KEY) if cursor else None
+        return shift_service.list_window(db, query, date_from, date_to, worker_id, status, after, skip, limit)
+    
+    query = keyset(shifts_query(worker_id, date_from, date_to, status), SHIFT_PAGE_KEY, cursor)
+    return db.execute(query.offset(skip).limit(limit)).scalars().all()
+
+def list_shift_rows(
+    db: Session,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    worker_id: Optional[int],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    status: Optional[str]
+):
+    """Like list_shifts, with stored shifts as column rows of SHIFT_ROW"""
+    if date_from and date_to:
+        query = keyset(shift_rows_query(worker_id, date_from, date_to, status, templates=False), SHIFT_PAGE_KEY, cursor)
+        after = decode_cursor(cursor, SHIFT_PAGE_KEY) if cursor else None
+        return shift_service.list_window(db, query, date_from, date_to, worker_id, status, after, skip, limit, rows=True)
+    
+    query = keyset(shift_rows_query(worker_id, date_from, date_to, status), SHIFT_PAGE_KEY, cursor)
+    return db.execute(query.offset(skip).limit(limit)).all()
+
+def list_today_shifts(db: Session):
+    """Return today's stored shifts merged with today's recurring occurrences"""
+    stored = db.execute(today_shifts_query()).scalars().all()
+    return shift_service.merge_shifts(stored, shift_service.iter_occurrences(db, date.today(), date.today()))
+
 @router.get("/", response_model=List[schemas.Shift])
 def get_shifts(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     worker_id: Optional[int] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
     status: Optional[str] = Query(None),
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Get shifts with optional filtering"""
-    query = db.query(models.Shift).options(joinedload(models.Shift.worker))
+    """Get shifts with optional filtering
     
-    if worker_id:
-        query = query.filter(models.Shift.worker_id == worker_id)
-    
-    if date_from:
-        query = query.filter(models.Shift.date >= date_from)
-    
-    if date_to:
-        query = query.filter(models.Shift.date <= date_to)
-    
-    if status:
-        query = query.filter(models.Shift.status == status)
+    With both date_from and date_to, recurring shifts are returned as their
+    occurrences within that window instead of as stored rows.
+    """
+    if fast:
+        rows = list_shift_rows(db, skip, limit, cursor, worker_id, date_from, date_to, status)
+        set_next_cursor(response, rows, limit, ["date", "id"])
+        return json_response(SHIFT_ROW.dump(rows), response)
     
-    shifts = query.offset(skip).limit(limit).all()
+    shifts = list_shifts(db, skip, limit, cursor, worker_id, date_from, date_to, status)
+    set_next_cursor(response, shifts, limit, ["date", "id"])
     return shifts
 
 @router.get("/{shift_id}", response_model=schemas.Shift)
@@ -51,28 +168,48 @@ def create_shift(shift: schemas.ShiftCreate, db: Session = Depends(get_db)):
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     
-    # Check for overlapping shifts
-    overlapping_shift = db.query(models.Shift).filter(
-        models.Shift.worker_id == shift.worker_id,
-        models.Shift.date == shift.date,
-        models.Shift.status != "cancelled"
-    ).first()
-    
-    if overlapping_shift:
-        raise HTTPException(
-            status_code=400, 
-            detail="Worker already has a shift scheduled for this date"
-        )
+    invalid_reason = shift_service.validate_interval(shift.start_time, shift.end_time)
+    if invalid_reason:
+        raise HTTPException(status_code=400, detail=invalid_reason)
     
     db_shift = models.Shift(**shift.dict())
     db.add(db_shift)
+    
+    # Check for overlapping shifts, every occurrence of a recurring one;
+    # nothing is committed if there is one
+    if shift.status != schemas.ShiftStatus.CANCELLED:
+        db.flush()
+        if shift_service.has_overlap(db, db_shift):
+            raise HTTPException(
+                status_code=400, 
+                detail="Worker already has an overlapping shift"
+            )
+    
     db.commit()
+    response_cache.bump(SHIFTS)
     db.refresh(db_shift)
     
     # Reload with worker information
     shift_with_worker = db.query(models.Shift).options(joinedload(models.Shift.worker)).filter(models.Shift.id == db_shift.id).first()
     return shift_with_worker
 
+@router.post("/bulk", response_model=schemas.ShiftBulkResult, status_code=status.HTTP_201_CREATED)
+def create_shifts_bulk(request: schemas.ShiftBulkCreate, db: Session = Depends(get_db)):
+    """Create many shifts at once, expanding recurring ones through repeat_until"""
+    try:
+        created_count, skipped_count, errors = shift_service.schedule_shifts(
+            db, request.shifts, request.repeat_until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response_cache.bump(SHIFTS)
+
+    return {
+        "created_count": created_count,
+        "skipped_count": skipped_count,
+        "errors": errors
+    }
+
 @router.put("/{shift_id}", response_model=schemas.Shift)
 def update_shift(shift_id: int, shift_update: schemas.ShiftUpdate, db: Session = Depends(get_db)):
     """Update a shift"""
@@ -84,11 +221,34 @@ def update_shift(shift_id: int, shift_update: schemas.ShiftUpdate, db: Session =
     for field, value in update_data.items():
         setattr(shift, field, value)
     
+    if {
+        "worker_id", "date", "start_time", "end_time", "status",
+        "is_recurring", "recurrence_pattern", "recurrence_end"
+    } & update_data.keys():
+        invalid_reason = shift_service.validate_interval(shift.start_time, shift.end_time)
+        if invalid_reason:
+            raise HTTPException(status_code=400, detail=invalid_reason)
+        
+        # Check for overlapping shifts, ignoring this one
+        if shift.status != "cancelled":
+            db.flush()
+            if shift_service.has_overlap(db, shift):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Worker already has an overlapping shift"
+                )
+    
     db.commit()
+    response_cache.bump(SHIFTS)
     db.refresh(shift)
     
     # Reload with worker information
     shift_with_worker = db.query(models.Shift).options(joinedload(models.Shift.worker)).filter(models.Shift.id == shift_id).first()
+    if "status" in update_data:
+        event_hub.publish(
+            SHIFT_STATUS, shift_id=shift_id, worker_id=shift_with_worker.worker_id,
+            date=shift_with_worker.date, status=shift_with_worker.status
+        )
     return shift_with_worker
 
 @router.delete("/{shift_id}")
@@ -100,16 +260,93 @@ def delete_shift(shift_id: int, db: Session = Depends(get_db)):
     
     db.delete(shift)
     db.commit()
+    response_cache.bump(SHIFTS)
     return {"message": "Shift deleted successfully"}
 
+def get_recurring_shift(db: Session, shift_id: int) -> models.Shift:
+    """Load a recurring shift or raise 404/400"""
+    shift = db.query(models.Shift).filter(models.Shift.id == shift_id).first()
+    if not shift:
+        raise HTTPException(status_code=404, detail="Shift not found")
+    if not (shift.is_recurring and shift.recurrence_pattern):
+        raise HTTPException(status_code=400, detail="Shift is not recurring")
+    return shift
+
+@router.put("/{shift_id}/occurrences/{occurrence_date}", response_model=schemas.Shift)
+def update_shift_occurrence(
+    shift_id: int,
+    occurrence_date: date,
+    occurrence_update: schemas.ShiftOccurrenceUpdate,
+    db: Session = Depends(get_db)
+):
+    """Edit or cancel one occurrence of a recurring shift"""
+    shift = get_recurring_shift(db, shift_id)
+    occurrence = shift_service.get_occurrence(db, shift, occurrence_date)
+    if not occurrence:
+        raise HTTPException(status_code=404, detail="Shift does not occur on this date")
+
+    update_data = occurrence_update.dict(exclude_unset=True)
+    start_time = update_data.get("start_time") or occurrence.start_time
+    end_time = update_data.get("end_time") or occurrence.end_time
+    invalid_reason = shift_service.validate_interval(start_time, end_time)
+    if invalid_reason:
+        raise HTTPException(status_code=400, detail=invalid_reason)
+
+    # Check for overlapping shifts, ignoring the recurring shift itself
+    if update_data.get("status", occurrence.status) != "cancelled":
+        overlapping_shift = shift_service.find_overlapping_shift(
+            db, shift.worker_id, start_time, end_time, exclude_id=shift.id
+        )
+        if overlapping_shift:
+            raise HTTPException(
+                status_code=400,
+                detail="Worker already has an overlapping shift"
+            )
+
+    override = db.query(models.ShiftOverride).filter(
+        models.ShiftOverride.shift_id == shift_id,
+        models.ShiftOverride.occurrence_date == occurrence_date
+    ).first()
+    if not override:
+        override = models.ShiftOverride(shift_id=shift_id, occurrence_date=occurrence_date)
+        db.add(override)
+
+    for field, value in update_data.items():
+        setattr(override, field, value)
+
+    db.commit()
+    response_cache.bump(SHIFTS)
+    occurrence = shift_service.get_occurrence(db, shift, occurrence_date)
+    if "status" in update_data:
+        event_hub.publish(
+            SHIFT_STATUS, shift_id=shift_id, worker_id=occurrence.worker_id,
+            date=occurrence.date, status=occurrence.status
+        )
+    return occurrence
+
+@router.delete("/{shift_id}/occurrences/{occurrence_date}")
+def delete_shift_occurrence_override(shift_id: int, occurrence_date: date, db: Session = Depends(get_db)):
+    """Restore one occurrence of a recurring shift to the shift's values"""
+    get_recurring_shift(db, shift_id)
+    override = db.query(models.ShiftOverride).filter(
+        models.ShiftOverride.shift_id == shift_id,
+        models.ShiftOverride.occurrence_date == occurrence_date
+    ).first()
+    if not override:
+        raise HTTPException(status_code=404, detail="Shift occurrence override not found")
+
+    db.delete(override)
+    db.commit()
+    response_cache.bump(SHIFTS)
+    return {"message": "Shift occurrence restored successfully"}
+
 @router.get("/today/", response_model=List[schemas.Shift])
-def get_today_shifts(db: Session = Depends(get_db)):
+def get_today_shifts(request: Request, db: Session = Depends(get_db)):
     """Get all shifts for today"""
-    today = date.today()
-    shifts = db.query(models.Shift).options(joinedload(models.Shift.worker)).filter(
-        models.Shift.date == today
-    ).all()
-    return shifts
+    cached = response_cache.lookup(request, SHIFT_LIST_SCOPES)
+    if cached.response is not None:
+        return cached.response
+    return cached.store(SHIFT_LIST, list_today_shifts(db))
 
 @router.get("/worker/{worker_id}/upcoming", response_model=List[schemas.Shift])
 def get_worker_upcoming_shifts(worker_id: int, limit: int = 10, db: Session = Depends(get_db)):
@@ -1,46 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Response, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, aliased, raiseload, selectinload
+from typing import List, Optional, Set
 from datetime import datetime, timedelta
 from app.database import get_db
 from app import models, schemas
+from app.cache import ALL_SCOPES, TIME_RECORDS, response_cache
+from app.services import clock_service, rollup_service, shift_service
+from app.services.event_service import BREAK_END, BREAK_START, KEEP_ALIVE, event_hub
+from app.services.presence_service import presence_index
+from app.pagination import keyset, set_next_cursor
+from app.serialization import FAST_DESCRIPTION, RowShape, json_response
 
 router = APIRouter()
 
+# Keyset pagination order
+RECORD_PAGE_KEY = (models.TimeRecord.clock_in, models.TimeRecord.id)
+
+EXPAND_DESCRIPTION = "Comma-separated relations to include: worker, shift"
+
+DASHBOARD_STATS = TypeAdapter(schemas.DashboardStats)
+
+def expand_fields(expand: Optional[str]) -> Set[str]:
+    """Parse the expand parameter of time record responses"""
+    fields = {field.strip() for field in (expand or "").split(",") if field.strip()}
+    unknown = fields - {"worker", "shift"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot expand: {', '.join(sorted(unknown))}")
+    return fields
+
+def record_load_options(expand: Optional[str]):
+    """Loader options for time record responses
+    
+    Requested relations are loaded with one extra SELECT each for the whole
+    result; the others raise instead of lazy-loading and are left out of the
+    response, so serialising never queries for them.
+    """
+    fields = expand_fields(expand)
+    
+    options = []
+    if "worker" in fields:
+        options.append(selectinload(models.TimeRecord.worker))
+    else:
+        options.append(raiseload(models.TimeRecord.worker))
+    if "shift" in fields:
+        options.append(selectinload(models.TimeRecord.shift).selectinload(models.Shift.worker))
+    else:
+        options.append(raiseload(models.TimeRecord.shift))
+    return options
+
+def record_row_shape(expand: Optional[str]) -> RowShape:
+    """Column rows of time records with the requested relations joined in"""
+    fields = expand_fields(expand)
+    relations = {}
+    if "worker" in fields:
+        relations["worker"] = RowShape(schemas.Worker, aliased(models.Worker))
+    if "shift" in fields:
+        relations["shift"] = RowShape(schemas.Shift, aliased(models.Shift), {
+            "worker": RowShape(schemas.Worker, aliased(models.Worker))
+        })
+    return RowShape(schemas.TimeRecord, models.TimeRecord, relations)
+
+def written_record(db: Session, row, expand: Optional[str]):
+    """Response for a record row returned by a write, loading relations only when expanded"""
+    if not expand:
+        return dict(row._mapping)
+    return db.query(models.TimeRecord).options(*record_load_options(expand)).filter(
+        models.TimeRecord.id == row.id
+    ).first()
+
 @router.post("/clock-in", response_model=schemas.TimeRecord, status_code=status.HTTP_201_CREATED)
-def clock_in(time_record: schemas.TimeRecordCreate, db: Session = Depends(get_db)):
+def clock_in(
+    time_record: schemas.TimeRecordCreate,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Clock in a worker"""
-    # Verify worker exists
-    worker = db.query(models.Worker).filter(models.Worker.id == time_record.worker_id).first()
-    if not worker:
-        raise HTTPException(status_code=404, detail="Worker not found")
-    
-    # Check if worker is already clocked in
-    active_record = db.query(models.TimeRecord).filter(
-        models.TimeRecord.worker_id == time_record.worker_id,
-        models.TimeRecord.status == "active"
-    ).first()
-    
-    if active_record:
-        raise HTTPException(status_code=400, detail="Worker is already clocked in")
+    record_load_options(expand)
     
-    # Create new time record
-    db_record = models.TimeRecord(
-        worker_id=time_record.worker_id,
-        shift_id=time_record.shift_id,
-        clock_in=datetime.now(),
-        notes=time_record.notes,
-        status="active"
-    )
+    # One conditional insert checks the worker exists and is not clocked in
+    row = clock_service.clock_in(db, time_record.worker_id, time_record.shift_id, time_record.notes)
+    if row is None:
+        status_code, detail = clock_service.clock_in_error(db, time_record.worker_id)
+        raise HTTPException(status_code=status_code, detail=detail)
     
-    db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
-    return db_record
+    return written_record(db, row, expand)
 
 @router.put("/clock-out/{record_id}", response_model=schemas.TimeRecord)
-def clock_out(record_id: int, db: Session = Depends(get_db)):
+def clock_out(
+    record_id: int,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Clock out a worker"""
+    record_load_options(expand)
+    
     record = db.query(models.TimeRecord).filter(models.TimeRecord.id == record_id).first()
     if not record:
         raise HTTPException(status_code=404, detail="Time record not found")
@@ -48,28 +103,12 @@ def clock_out(record_id: int, db: Session = Depends(get_db)):
     if record.status != "active":
         raise HTTPException(status_code=400, detail="Time record is not active")
     
-    # Update record with clock out time
-    record.clock_out = datetime.now()
-    record.status = "completed"
-    
-    # Calculate total hours
-    if record.clock_in and record.clock_out:
-        total_time = record.clock_out - record.clock_in
-        
-        # Subtract break time if exists
-        if record.break_start and record.break_end:
-            break_time = record.break_end - record.break_start
-            total_time -= break_time
-        
-        record.total_hours = total_time.total_seconds() / 3600
-        
-        # Calculate overtime (assuming 8 hours is standard)
-        if record.total_hours > 8:
-            record.overtime_hours = record.total_hours - 8
+    # Only applies while the record is still active
+    row = clock_service.clock_out(db, record)
+    if row is None:
+        raise HTTPException(status_code=400, detail="Time record is not active")
     
-    db.commit()
-    db.refresh(record)
-    return record
+    return written_record(db, row, expand)
 
 @router.put("/break-start/{record_id}", response_model=schemas.TimeRecord)
 def start_break(record_id: int, db: Session = Depends(get_db)):
@@ -86,7 +125,10 @@ def start_break(record_id: int, db: Session = Depends(get_db)):
     
     record.break_start = datetime.now()
     db.commit()
+    response_cache.bump(TIME_RECORDS)
     db.refresh(record)
+    presence_index.break_changed(record.worker_id, on_break=True)
+    event_hub.publish(BREAK_START, record_id=record.id, worker_id=record.worker_id, break_start=record.break_start)
     return record
 
 @router.put("/break-end/{record_id}", response_model=schemas.TimeRecord)
@@ -104,24 +146,51 @@ def end_break(record_id: int, db: Session = Depends(get_db)):
     
     record.break_end = datetime.now()
     db.commit()
+    response_cache.bump(TIME_RECORDS)
     db.refresh(record)
+    presence_index.break_changed(record.worker_id, on_break=False)
+    event_hub.publish(BREAK_END, record_id=record.id, worker_id=record.worker_id, break_end=record.break_end)
     return record
 
 @router.get("/active", response_model=List[schemas.TimeRecord])
-def get_active_records(db: Session = Depends(get_db)):
+def get_active_records(
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Get all active time records (workers currently clocked in)"""
-    records = db.query(models.TimeRecord).filter(
+    query = db.query(models.TimeRecord).options(*record_load_options(expand)).filter(
         models.TimeRecord.status == "active"
-    ).all()
-    return records
+    )
+    
+    # Primary key lookups for the records the presence index knows about
+    if presence_index.ensure(db):
+        record_ids = presence_index.record_ids()
+        if not record_ids:
+            return []
+        query = query.filter(models.TimeRecord.id.in_(record_ids))
+    
+    return query.all()
 
 @router.get("/worker/{worker_id}/active", response_model=schemas.TimeRecord)
-def get_worker_active_record(worker_id: int, db: Session = Depends(get_db)):
+def get_worker_active_record(
+    worker_id: int,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
     """Get active time record for a specific worker"""
-    record = db.query(models.TimeRecord).filter(
+    query = db.query(models.TimeRecord).options(*record_load_options(expand)).filter(
         models.TimeRecord.worker_id == worker_id,
         models.TimeRecord.status == "active"
-    ).first()
+    )
+    
+    # Primary key lookup when the presence index knows the record
+    record = None
+    presence = presence_index.get(worker_id) if presence_index.ensure(db) else None
+    if presence is not None:
+        record = query.filter(models.TimeRecord.id == presence.record_id).first()
+    if record is None and (presence is not None or not presence_index.enabled):
+        # Index disabled or out of date, ask the database
+        record = query.first()
     
     if not record:
         raise HTTPException(status_code=404, detail="No active time record found for this worker")
@@ -130,53 +199,95 @@ def get_worker_active_record(worker_id: int, db: Session = Depends(get_db)):
 
 @router.get("/records", response_model=List[schemas.TimeRecord])
 def get_time_records(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     worker_id: int = None,
+    cursor: Optional[str] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
     """Get time records with optional filtering"""
-    query = db.query(models.TimeRecord)
+    if fast:
+        shape = record_row_shape(expand)
+        query = shape.select()
+        if worker_id:
+            query = query.where(models.TimeRecord.worker_id == worker_id)
+        rows = db.execute(keyset(query, RECORD_PAGE_KEY, cursor).offset(skip).limit(limit)).all()
+        set_next_cursor(response, rows, limit, ["clock_in", "id"])
+        return json_response(shape.dump(rows), response)
+    
+    query = db.query(models.TimeRecord).options(*record_load_options(expand))
     
     if worker_id:
         query = query.filter(models.TimeRecord.worker_id == worker_id)
     
+    query = keyset(query, RECORD_PAGE_KEY, cursor)
     records = query.offset(skip).limit(limit).all()
+    set_next_cursor(response, records, limit, ["clock_in", "id"])
     return records
 
 @router.get("/dashboard", response_model=schemas.DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db)):
+def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
     """Get dashboard statistics"""
-    # Count total workers
-    total_workers = db.query(models.Worker).count()
+    cached = response_cache.lookup(request, ALL_SCOPES)
+    if cached.response is not None:
+        return cached.response
     
-    # Count active workers
-    active_workers = db.query(models.Worker).filter(models.Worker.is_active == True).count()
+    # Worker and clock-in counters are maintained by the write paths
+    counters = rollup_service.get_counters(db)
     
-    # Count today's shifts
+    # Count today's stored shifts and recurring occurrences
     today = datetime.now().date()
+    day_start, day_end = shift_service.day_bounds(today, today)
     total_shifts_today = db.query(models.Shift).filter(
-        models.Shift.date == today
-    ).count()
-    
-    # Count workers currently clocked in
-    workers_clocked_in = db.query(models.TimeRecord).filter(
-        models.TimeRecord.status == "active"
-    ).count()
-    
-    # Calculate total hours today (simplified)
-    today_records = db.query(models.TimeRecord).filter(
-        models.TimeRecord.clock_in >= datetime.combine(today, datetime.min.time())
-    ).all()
+        models.Shift.date >= day_start,
+        models.Shift.date < day_end,
+        ~shift_service.TEMPLATE_FILTER
+    ).count() + sum(1 for _ in shift_service.iter_occurrences(db, today, today))
     
-    total_hours_today = sum(record.total_hours or 0 for record in today_records)
-    overtime_hours_today = sum(record.overtime_hours or 0 for record in today_records)
+    # Hours for records clocked in today
+    today_rollup = rollup_service.get_day(db, today)
     
-    return schemas.DashboardStats(
-        total_workers=total_workers,
-        active_workers=active_workers,
+    return cached.store(DASHBOARD_STATS, schemas.DashboardStats(
+        total_workers=counters[rollup_service.TOTAL_WORKERS],
+        active_workers=counters[rollup_service.ACTIVE_WORKERS],
         total_shifts_today=total_shifts_today,
-        workers_clocked_in=workers_clocked_in,
-        total_hours_today=total_hours_today,
-        overtime_hours_today=overtime_hours_today
-    ) 
\ No newline at end of file
+        workers_clocked_in=(
+            presence_index.count() if presence_index.ensure(db)
+            else counters[rollup_service.WORKERS_CLOCKED_IN]
+        ),
+        total_hours_today=today_rollup.total_hours,
+        overtime_hours_today=today_rollup.overtime_hours
+    ))
+
+@router.post("/dashboard/rebuild")
+def rebuild_dashboard_stats(db: Session = Depends(get_db)):
+    """Recompute dashboard rollups from workers and time records"""
+    result = rollup_service.rebuild_rollups(db)
+    presence_index.invalidate()
+    response_cache.bump()
+    return {"message": "Dashboard rollups rebuilt", **result}
+
+@router.get("/stream")
+async def stream_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """Stream clock, break and shift status events as server-sent events
+
+    A ``resync`` event means events were missed and the client should refetch.
+    """
+    subscriber = event_hub.subscribe(last_event_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                event = await subscriber.next()
+                yield event.encode() if event else KEEP_ALIVE
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
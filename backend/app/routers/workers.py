@@ -1,16 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app import models, schemas
+from app.services import rollup_service, stats_service
+from app.cache import WORKERS, response_cache
+from app.pagination import keyset, set_next_cursor
 
 router = APIRouter()
 
+# Keyset pagination order
+WORKER_PAGE_KEY = (models.Worker.id,)
+
+WORKER_LIST = TypeAdapter(List[schemas.Worker])
+
 @router.get("/", response_model=List[schemas.Worker])
-def get_workers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_workers(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """Get all workers"""
-    workers = db.query(models.Worker).offset(skip).limit(limit).all()
-    return workers
+    cached = response_cache.lookup(request, (WORKERS,))
+    if cached.response is not None:
+        return cached.response
+    
+    query = keyset(db.query(models.Worker), WORKER_PAGE_KEY, cursor)
+    workers = query.offset(skip).limit(limit).all()
+    set_next_cursor(response, workers, limit, ["id"])
+    return cached.store(WORKER_LIST, workers, response)
+
+@router.get("/stats", response_model=List[schemas.WorkerStats])
+def get_workers_stats(
+    ids: Optional[str] = Query(None, description="Comma-separated worker IDs"),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """Get statistics for several workers in one request"""
+    worker_ids = None
+    if ids:
+        try:
+            worker_ids = [int(worker_id) for worker_id in ids.split(",") if worker_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    
+    return stats_service.compute_worker_stats(db, worker_ids, skip=skip, limit=limit)
 
 @router.get("/{worker_id}", response_model=schemas.Worker)
 def get_worker(worker_id: int, db: Session = Depends(get_db)):
@@ -30,7 +69,9 @@ def create_worker(worker: schemas.WorkerCreate, db: Session = Depends(get_db)):
     
     db_worker = models.Worker(**worker.dict())
     db.add(db_worker)
+    rollup_service.record_worker_created(db, db_worker)
     db.commit()
+    response_cache.bump(WORKERS)
     db.refresh(db_worker)
     return db_worker
 
@@ -47,11 +88,14 @@ def update_worker(worker_id: int, worker_update: schemas.WorkerUpdate, db: Sessi
         if existing_worker:
             raise HTTPException(status_code=400, detail="Email already registered")
     
+    was_active = worker.is_active
     update_data = worker_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(worker, field, value)
     
+    rollup_service.record_worker_active_changed(db, was_active, worker.is_active)
     db.commit()
+    response_cache.bump(WORKERS)
     db.refresh(worker)
     return worker
 
@@ -62,8 +106,10 @@ def delete_worker(worker_id: int, db: Session = Depends(get_db)):
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     
+    rollup_service.record_worker_active_changed(db, worker.is_active, False)
     worker.is_active = False
     db.commit()
+    response_cache.bump(WORKERS)
     return {"message": "Worker deactivated successfully"}
 
 @router.get("/{worker_id}/stats", response_model=schemas.WorkerStats)
@@ -73,16 +119,4 @@ def get_worker_stats(worker_id: int, db: Session = Depends(get_db)):
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     
-    # Calculate statistics (simplified for now)
-    # In a real implementation, you'd calculate based on actual time records
-    stats = schemas.WorkerStats(
-        worker_id=worker.id,
-        worker_name=worker.name,
-        total_hours_week=40.0,
-        total_hours_month=160.0,
-        overtime_hours_week=5.0,
-        overtime_hours_month=20.0,
-        shifts_completed_week=5,
-        shifts_completed_month=20
-    )
-    return stats 
\ No newline at end of file
+    return stats_service.compute_worker_stats(db, [worker.id])[0]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, model_validator
+from sqlalchemy.exc import InvalidRequestError
+from datetime import date, datetime
+from typing import Any, Dict, Optional, List
 from enum import Enum
 
 class ShiftStatus(str, Enum):
@@ -13,6 +14,28 @@ class RecurrencePattern(str, Enum):
     WEEKLY = "weekly"
     MONTHLY = "monthly"
 
+class SummaryPeriod(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class SummaryGroup(str, Enum):
+    POSITION = "position"
+    WORKER = "worker"
+    ALL = "all"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    XLSX = "xlsx"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 class TimeRecordStatus(str, Enum):
     ACTIVE = "active"
     COMPLETED = "completed"
@@ -53,6 +76,7 @@ class ShiftBase(BaseModel):
     end_time: datetime
     is_recurring: Optional[bool] = False
     recurrence_pattern: Optional[RecurrencePattern] = None
+    recurrence_end: Optional[datetime] = None
     status: Optional[ShiftStatus] = ShiftStatus.SCHEDULED
     notes: Optional[str] = None
 
@@ -66,6 +90,7 @@ class ShiftUpdate(BaseModel):
     end_time: Optional[datetime] = None
     is_recurring: Optional[bool] = None
     recurrence_pattern: Optional[RecurrencePattern] = None
+    recurrence_end: Optional[datetime] = None
     status: Optional[ShiftStatus] = None
     notes: Optional[str] = None
 
@@ -78,6 +103,21 @@ class Shift(ShiftBase):
     class Config:
         from_attributes = True
 
+class ShiftOccurrenceUpdate(BaseModel):
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    status: Optional[ShiftStatus] = None
+    notes: Optional[str] = None
+
+class ShiftBulkCreate(BaseModel):
+    shifts: List[ShiftCreate]
+    repeat_until: Optional[datetime] = None
+
+class ShiftBulkResult(BaseModel):
+    created_count: int
+    skipped_count: int
+    errors: List[str]
+
 # Time Record Schemas
 class TimeRecordBase(BaseModel):
     worker_id: int
@@ -111,6 +151,21 @@ class TimeRecord(TimeRecordBase):
     
     class Config:
         from_attributes = True
+    
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unexpanded(cls, data: Any) -> Any:
+        """Read ORM records field by field, leaving out relations loaded with
+        raiseload because they were not expanded"""
+        if isinstance(data, dict):
+            return data
+        values = {}
+        for name in cls.model_fields:
+            try:
+                values[name] = getattr(data, name)
+            except InvalidRequestError:
+                pass
+        return values
 
 # Holiday Schemas
 class HolidayBase(BaseModel):
@@ -158,4 +213,48 @@ class WorkerStats(BaseModel):
     overtime_hours_week: float
     overtime_hours_month: float
     shifts_completed_week: int
-    shifts_completed_month: int 
\ No newline at end of file
+    shifts_completed_month: int
+
+# Report Schemas
+class PayrollEntry(BaseModel):
+    worker_id: int
+    worker_name: str
+    hourly_rate: float
+    regular_hours: float
+    daily_overtime_hours: float
+    weekly_overtime_hours: float
+    holiday_hours: float
+    regular_pay: float
+    overtime_pay: float
+    holiday_pay: float
+    gross_pay: float
+
+class PayrollReport(BaseModel):
+    period_start: date
+    period_end: date
+    holidays: List[date]
+    total_hours: float
+    total_gross_pay: float
+    entries: List[PayrollEntry]
+
+class HoursSummaryRow(BaseModel):
+    period_start: date
+    position: Optional[str] = None
+    worker_id: Optional[int] = None
+    record_count: int
+    total_hours: float
+    overtime_hours: float
+
+# Job Schemas
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    processed_rows: int
+    total_rows: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
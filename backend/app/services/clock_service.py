@@ -0,0 +1,248 @@
+"""Clock-in and clock-out write path.
+
+At a shift change hundreds of workers clock in within a minute. A clock-in is
+therefore a single conditional ``INSERT ... SELECT`` that only inserts when
+the worker exists and has no active record, and hands the new row back with
+``RETURNING``. The partial unique index on active records closes the same
+race for concurrent transactions on databases that do not serialise writers.
+
+With ``CLOCK_IN_BATCH_MS`` set, clock-ins arriving within that window are
+written by a background thread in one transaction, so a burst costs one
+commit per batch instead of one per worker.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Integer, Text, exists, insert, literal, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.cache import TIME_RECORDS, response_cache
+from app.services import rollup_service
+from app.services.event_service import CLOCK_IN, CLOCK_OUT, event_hub
+from app.services.presence_service import presence_index
+
+# Milliseconds to collect concurrent clock-ins into one transaction, 0 disables
+CLOCK_IN_BATCH_MS = int(os.getenv("CLOCK_IN_BATCH_MS", "0"))
+CLOCK_IN_BATCH_SIZE = int(os.getenv("CLOCK_IN_BATCH_SIZE", "200"))
+
+# Standard working day, hours beyond it count as overtime
+STANDARD_HOURS = 8
+
+RECORD_COLUMNS = tuple(models.TimeRecord.__table__.columns)
+
+# Worker fields sent with clock-in events, so dashboards can list the record without fetching it
+EVENT_WORKER_COLUMNS = (
+    models.Worker.id,
+    models.Worker.name,
+    models.Worker.email,
+    models.Worker.position,
+    models.Worker.is_active
+)
+
+ClockIn = Tuple[int, Optional[int], Optional[str], datetime]
+
+
+def clock_in_statement(worker_id: int, shift_id: Optional[int], notes: Optional[str], clock_in_time: datetime):
+    """Insert an active record for an existing worker who is not clocked in"""
+    record = models.TimeRecord
+    already_active = select(record.id).where(
+        record.worker_id == worker_id,
+        record.status == "active"
+    )
+    source = select(
+        models.Worker.id,
+        literal(shift_id, Integer),
+        literal(clock_in_time, DateTime),
+        literal(notes, Text),
+        literal("active")
+    ).where(models.Worker.id == worker_id, ~exists(already_active))
+
+    return insert(record).from_select(
+        ["worker_id", "shift_id", "clock_in", "notes", "status"], source
+    ).returning(*RECORD_COLUMNS)
+
+
+def event_workers(db: Session, worker_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """The fields clock-in events carry for each of ``worker_ids``, by id"""
+    rows = db.execute(select(*EVENT_WORKER_COLUMNS).where(models.Worker.id.in_(worker_ids)))
+    return {row.id: row._asdict() for row in rows}
+
+
+def clocked_in(row: Row, worker: Dict[str, Any]):
+    """Update the presence index and caches, and notify streams about a committed clock-in
+
+    The event carries the whole record with ``worker`` nested in it.
+    """
+    presence_index.clocked_in(row.worker_id, row.id, row.clock_in)
+    response_cache.bump(TIME_RECORDS)
+    event_hub.publish(
+        CLOCK_IN,
+        record_id=row.id,
+        worker_id=row.worker_id,
+        shift_id=row.shift_id,
+        clock_in=row.clock_in,
+        record={**row._asdict(), "worker": worker}
+    )
+
+
+def clock_in_error(db: Session, worker_id: int) -> Tuple[int, str]:
+    """Status code and detail explaining why a clock-in inserted nothing"""
+    if db.get(models.Worker, worker_id) is None:
+        return 404, "Worker not found"
+    return 400, "Worker is already clocked in"
+
+
+def _clock_in_one(db: Session, worker_id: int, shift_id: Optional[int], notes: Optional[str], clock_in_time: datetime) -> Optional[Row]:
+    try:
+        row = db.execute(clock_in_statement(worker_id, shift_id, notes, clock_in_time)).first()
+        if row is not None:
+            rollup_service.record_clock_in(db, row)
+            workers = event_workers(db, [worker_id])
+        db.commit()
+    except IntegrityError:
+        # A concurrent transaction clocked the worker in first
+        db.rollback()
+        return None
+    if row is not None:
+        clocked_in(row, workers[worker_id])
+    return row
+
+
+def clock_in(db: Session, worker_id: int, shift_id: Optional[int] = None, notes: Optional[str] = None) -> Optional[Row]:
+    """Clock a worker in and commit
+
+    Returns the new record's row, or None when the worker does not exist or
+    is already clocked in. The database decides, not the presence index,
+    which may be out of date. Goes through the batching writer when enabled.
+    """
+    if CLOCK_IN_BATCH_MS > 0:
+        return get_clock_in_writer().submit(worker_id, shift_id, notes).result()
+    return _clock_in_one(db, worker_id, shift_id, notes, datetime.now())
+
+
+def clock_out_values(record: models.TimeRecord, clock_out_time: datetime) -> Dict:
+    """Column values completing an active record at ``clock_out_time``"""
+    total_time = clock_out_time - record.clock_in
+
+    # Subtract break time if exists
+    if record.break_start and record.break_end:
+        total_time -= record.break_end - record.break_start
+
+    total_hours = total_time.total_seconds() / 3600
+    return {
+        "clock_out": clock_out_time,
+        "status": "completed",
+        "total_hours": total_hours,
+        "overtime_hours": total_hours - STANDARD_HOURS if total_hours > STANDARD_HOURS else record.overtime_hours
+    }
+
+
+def clock_out(db: Session, record: models.TimeRecord) -> Optional[Row]:
+    """Complete an active record and commit
+
+    The update only applies while the record is still active, so concurrent
+    clock-outs of one record cannot both succeed. Returns the updated row, or
+    None if the record was no longer active.
+    """
+    row = db.execute(
+        update(models.TimeRecord)
+        .where(models.TimeRecord.id == record.id, models.TimeRecord.status == "active")
+        .values(**clock_out_values(record, datetime.now()))
+        .returning(*RECORD_COLUMNS)
+    ).first()
+    if row is not None:
+        rollup_service.record_clock_out(db, row)
+    db.commit()
+    presence_index.clocked_out(record.worker_id)
+    response_cache.bump(TIME_RECORDS)
+    if row is not None:
+        event_hub.publish(
+            CLOCK_OUT, record_id=row.id, worker_id=row.worker_id, clock_in=row.clock_in,
+            clock_out=row.clock_out, total_hours=row.total_hours, overtime_hours=row.overtime_hours
+        )
+    return row
+
+
+class ClockInWriter:
+    """Background writer coalescing concurrent clock-ins into one transaction"""
+
+    def __init__(self, session_factory, window_ms: int = CLOCK_IN_BATCH_MS, batch_size: int = CLOCK_IN_BATCH_SIZE):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._batch_size = batch_size
+        self._queue: "queue.Queue[Tuple[ClockIn, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="clock-in-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, worker_id: int, shift_id: Optional[int] = None, notes: Optional[str] = None) -> Future:
+        """Queue a clock-in; the future resolves to its row or None"""
+        future = Future()
+        self._queue.put(((worker_id, shift_id, notes, datetime.now()), future))
+        return future
+
+    def _next_batch(self) -> List[Tuple[ClockIn, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write(self, batch: List[Tuple[ClockIn, Future]]):
+        db = self._session_factory()
+        try:
+            try:
+                rows = [db.execute(clock_in_statement(*clock_in)).first() for clock_in, _ in batch]
+                added = [row for row in rows if row is not None]
+                rollup_service.record_time_records_added(db, [row._asdict() for row in added])
+                workers = event_workers(db, list({row.worker_id for row in added}))
+                db.commit()
+                for row in added:
+                    clocked_in(row, workers[row.worker_id])
+            except IntegrityError:
+                # Lost a race with another process; retry one transaction per clock-in
+                db.rollback()
+                rows = [_clock_in_one(db, *clock_in) for clock_in, _ in batch]
+        finally:
+            db.close()
+
+        for (_, future), row in zip(batch, rows):
+            future.set_result(row)
+
+
+_writer: Optional[ClockInWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_clock_in_writer() -> ClockInWriter:
+    """Return the process-wide clock-in writer, starting it on first use"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                from app.database import SessionLocal
+                _writer = ClockInWriter(SessionLocal)
+    return _writer
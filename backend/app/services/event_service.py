@@ -0,0 +1,145 @@
+"""Live clock and shift events for server-sent event streams.
+
+Write handlers publish small events (clock-in, clock-out, break start/end,
+shift status changes) to a process-wide hub, which fans them out to every
+connected stream so dashboards update incrementally instead of polling.
+
+Every subscriber has a bounded queue. A client that falls behind by more than
+``EVENT_QUEUE_SIZE`` events has its backlog replaced by a single ``resync``
+event, telling it to refetch the full state, so a slow client never holds up
+the others or grows memory. Recent events are kept so a reconnecting client
+can resume from its ``Last-Event-ID``. Events only reach streams served by
+the process that handled the write.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set
+
+# Events buffered per subscriber before it is told to resync
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# Recent events kept for clients resuming with Last-Event-ID
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# Seconds between keep-alive comments on an idle stream
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+CLOCK_IN = "clock_in"
+CLOCK_OUT = "clock_out"
+BREAK_START = "break_start"
+BREAK_END = "break_end"
+SHIFT_STATUS = "shift_status"
+RESYNC = "resync"
+
+KEEP_ALIVE = ": keep-alive\n\n"
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+    def encode(self) -> str:
+        """Format as a server-sent event"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=_json_default)}\n\n"
+
+
+class Subscriber:
+    """One connected stream; only touched from the event loop"""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(queue_size)
+        self.last_id = -1
+
+    def offer(self, event: Event):
+        # Replayed history and live fan-out can overlap
+        if event.id <= self.last_id:
+            return
+        self.last_id = event.id
+        if self._queue.full():
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = Event(event.id, RESYNC, {})
+        self._queue.put_nowait(event)
+
+    async def next(self, timeout: float = EVENT_HEARTBEAT_SECONDS) -> Optional[Event]:
+        """Wait for the next event, or None after ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """Broadcasts events published from any thread to the subscribers"""
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, event_type: str, **data):
+        """Record an event and fan it out on the event loop; safe from any thread"""
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data)
+            self._history.append(event)
+            loop = self._loop if self._subscribers else None
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            # The loop has been closed, e.g. during shutdown
+            pass
+
+    def _fan_out(self, event: Event):
+        for subscriber in list(self._subscribers):
+            subscriber.offer(event)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a stream, replaying events after ``last_event_id`` if still kept"""
+        subscriber = Subscriber()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscriber)
+            history: List[Event] = list(self._history)
+            newest = self._last_id
+
+        try:
+            last_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_id = None
+
+        if last_id is None:
+            # New streams only get events published from now on
+            subscriber.last_id = newest
+        elif last_id > newest or (last_id < newest and (not history or history[0].id > last_id + 1)):
+            # The server restarted, or the missed events are no longer kept
+            subscriber.offer(Event(newest, RESYNC, {}))
+        else:
+            for event in history:
+                if event.id > last_id:
+                    subscriber.offer(event)
+            subscriber.last_id = max(subscriber.last_id, last_id)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+event_hub = EventHub()
@@ -0,0 +1,218 @@
+"""Bulk exports of time records as CSV, Parquet, Arrow or XLSX.
+
+Every format is written from a database cursor in batches and sent as it is
+produced, so memory use stays flat however many records are exported.
+Parquet and Arrow keep column types (timestamps, floats) for BI tools and
+are written with ``pyarrow``. XLSX is written
+with openpyxl's write-only mode; the zip container is only complete once
+saved, so it is spooled to a temporary file and streamed from there.
+"""
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from typing import Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
+from app import models
+from app.database import SessionLocal
+
+EXPORT_HEADERS = [
+    'Worker Name', 'Worker Email', 'Position', 'Hourly Rate', 'Clock In',
+    'Clock Out', 'Total Hours', 'Overtime Hours', 'Status', 'Notes'
+]
+
+# Rows fetched per round trip and written per chunk
+CSV_BATCH_ROWS = 1000
+# Rows per Parquet row group / Arrow record batch, and per fetch for those and XLSX
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "50000"))
+
+# Rows per worksheet including the header; later rows go to further sheets
+XLSX_MAX_ROWS = 1048576
+XLSX_SHEET_TITLE = "Time Records"
+# Bytes read per chunk when sending the saved workbook
+XLSX_CHUNK_BYTES = 1024 * 1024
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def export_query(worker_id: Optional[int] = None, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Only the exported columns of the matching records, in id order"""
+    query = select(
+        models.Worker.name,
+        models.Worker.email,
+        models.Worker.position,
+        models.Worker.hourly_rate,
+        models.TimeRecord.clock_in,
+        models.TimeRecord.clock_out,
+        models.TimeRecord.total_hours,
+        models.TimeRecord.overtime_hours,
+        models.TimeRecord.status,
+        models.TimeRecord.notes
+    ).join(models.Worker, models.TimeRecord.worker_id == models.Worker.id)
+
+    if worker_id:
+        query = query.where(models.TimeRecord.worker_id == worker_id)
+    if date_from:
+        query = query.where(models.TimeRecord.clock_in >= date_from)
+    if date_to:
+        query = query.where(models.TimeRecord.clock_in <= date_to)
+
+    return query.order_by(models.TimeRecord.id)
+
+
+def _batches(batch_rows: int, worker_id=None, date_from=None, date_to=None) -> Iterator[List[Row]]:
+    # The request-scoped session may be closed before the body is sent,
+    # so the stream owns its own session for as long as it runs
+    db = SessionLocal()
+    try:
+        result = db.execute(export_query(worker_id, date_from, date_to).execution_options(yield_per=batch_rows))
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def iter_csv(worker_id=None, date_from=None, date_to=None) -> Iterator[str]:
+    """Yield CSV text chunks straight from a database cursor"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+
+    for batch in _batches(CSV_BATCH_ROWS, worker_id, date_from, date_to):
+        for (name, email, position, hourly_rate, clock_in, clock_out,
+             total_hours, overtime_hours, record_status, notes) in batch:
+            writer.writerow([
+                name,
+                email,
+                position,
+                hourly_rate,
+                clock_in.strftime('%Y-%m-%d %H:%M:%S') if clock_in else '',
+                clock_out.strftime('%Y-%m-%d %H:%M:%S') if clock_out else '',
+                total_hours or 0,
+                overtime_hours or 0,
+                record_status,
+                notes or ''
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+class _ChunkSink:
+    """Write-only file object that keeps what is written until drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema():
+    text, number, timestamp = pa.string(), pa.float64(), pa.timestamp("us")
+    return pa.schema(list(zip(EXPORT_HEADERS, [
+        text, text, text, number, timestamp, timestamp, number, number, text, text
+    ])))
+
+
+def _iter_arrow_batches(writer_factory, worker_id, date_from, date_to) -> Iterator[bytes]:
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = writer_factory(sink, schema)
+    try:
+        for batch in _batches(EXPORT_BATCH_ROWS, worker_id, date_from, date_to):
+            columns = zip(*batch)
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(worker_id=None, date_from=None, date_to=None) -> Iterator[bytes]:
+    """Yield a Parquet file one row group at a time"""
+    return _iter_arrow_batches(pq.ParquetWriter, worker_id, date_from, date_to)
+
+
+def iter_arrow(worker_id=None, date_from=None, date_to=None) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream one record batch at a time"""
+    return _iter_arrow_batches(pa.ipc.new_stream, worker_id, date_from, date_to)
+
+
+def _xlsx_value(value):
+    # openpyxl refuses control characters in strings
+    return ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+
+
+def iter_xlsx(worker_id=None, date_from=None, date_to=None) -> Iterator[bytes]:
+    """Yield an XLSX workbook written row by row in write-only mode"""
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = XLSX_MAX_ROWS
+
+    with tempfile.TemporaryFile() as target:
+        for batch in _batches(EXPORT_BATCH_ROWS, worker_id, date_from, date_to):
+            for row in batch:
+                if sheet_rows >= XLSX_MAX_ROWS:
+                    number = len(workbook.worksheets) + 1
+                    sheet = workbook.create_sheet(XLSX_SHEET_TITLE if number == 1 else f"{XLSX_SHEET_TITLE} {number}")
+                    sheet.append(EXPORT_HEADERS)
+                    sheet_rows = 1
+                sheet.append([_xlsx_value(value) for value in row])
+                sheet_rows += 1
+
+        if sheet is None:
+            workbook.create_sheet(XLSX_SHEET_TITLE).append(EXPORT_HEADERS)
+        workbook.save(target)
+
+        target.seek(0)
+        while True:
+            chunk = target.read(XLSX_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORTERS = {
+    "csv": iter_csv,
+    "parquet": iter_parquet,
+    "arrow": iter_arrow,
+    "xlsx": iter_xlsx,
+}
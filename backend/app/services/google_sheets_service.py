@@ -1,15 +1,50 @@
 import os
-from typing import List, Dict, Any, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import math
+from typing import List, Dict, Any, Optional, Callable
 from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
+from google.auth.exceptions import RefreshError
+from google_auth_httplib2 import AuthorizedHttp, Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+import httplib2
 import json
 from datetime import datetime
 
+# googleapiclient is blocking, so every request runs on this bounded pool
+# instead of the event loop; its size caps concurrent calls to the API
+SHEETS_MAX_CONCURRENCY = int(os.getenv("GOOGLE_SHEETS_MAX_CONCURRENCY", "4"))
+
+# Retries with randomised exponential backoff on 429 and 5xx responses
+SHEETS_MAX_RETRIES = int(os.getenv("GOOGLE_SHEETS_MAX_RETRIES", "5"))
+
+# Point the client at another endpoint, e.g. a local fake Sheets server
+SHEETS_API_ENDPOINT = os.getenv("GOOGLE_SHEETS_API_ENDPOINT")
+
+# Large exports are split into fixed-size row ranges, several ranges per
+# values().batchUpdate request, with requests sent in parallel on the pool
+SHEETS_EXPORT_CHUNK_ROWS = int(os.getenv("GOOGLE_SHEETS_EXPORT_CHUNK_ROWS", "2000"))
+SHEETS_EXPORT_RANGES_PER_REQUEST = int(os.getenv("GOOGLE_SHEETS_EXPORT_RANGES_PER_REQUEST", "5"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=SHEETS_MAX_CONCURRENCY,
+    thread_name_prefix="google-sheets"
+)
+
+# Process-wide service, see get_google_sheets_service()
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
 class GoogleSheetsService:
     def __init__(self):
         self.service = None
+        self.credentials = None
+        # httplib2 is not thread-safe, so each pool thread gets its own connection
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
         self._initialize_service()
     
     def _initialize_service(self):
@@ -36,16 +71,98 @@ class GoogleSheetsService:
                     self.service = None
                     return
             
-            self.service = build('sheets', 'v4', credentials=credentials)
+            client_options = {'api_endpoint': SHEETS_API_ENDPOINT} if SHEETS_API_ENDPOINT else None
+            self.credentials = credentials
+            self.service = build('sheets', 'v4', credentials=credentials, client_options=client_options)
         except Exception as e:
             print(f"Failed to initialize Google Sheets service: {e}")
             self.service = None
     
+    def _http(self) -> AuthorizedHttp:
+        """Return the calling thread's authorized HTTP connection"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+    
+    def _ensure_token(self):
+        """Refresh an expired access token once, even when many threads notice"""
+        if self.credentials.valid:
+            return
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request(httplib2.Http()))
+    
+    def _execute_sync(self, request):
+        try:
+            self._ensure_token()
+            return request.execute(http=self._http(), num_retries=SHEETS_MAX_RETRIES)
+        except RefreshError:
+            # Credentials were revoked or rotated, rebuild them on the next call
+            invalidate_google_sheets_service()
+            raise
+    
+    async def _execute(self, request):
+        """Execute a googleapiclient request on the Sheets thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self._execute_sync, request)
+    
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        """Convert a value for the Sheets API, keeping numbers numeric"""
+        if value is None:
+            return ''
+        if isinstance(value, float) and not math.isfinite(value):
+            return ''
+        if isinstance(value, (bool, int, float)):
+            return value
+        return str(value)
+    
+    async def _write_values(
+        self,
+        spreadsheet_id: str,
+        sheet_name: str,
+        values: List[List[Any]],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Write rows starting at A1 in chunked, parallel batchUpdate requests
+        
+        Returns the number of requests sent. ``progress`` is called with the
+        rows written so far and the total after each request completes.
+        """
+        chunk_rows = SHEETS_EXPORT_CHUNK_ROWS
+        ranges = [
+            {
+                'range': f"{sheet_name}!A{start + 1}",
+                'values': values[start:start + chunk_rows]
+            }
+            for start in range(0, len(values), chunk_rows)
+        ]
+        per_request = SHEETS_EXPORT_RANGES_PER_REQUEST
+        batches = [ranges[i:i + per_request] for i in range(0, len(ranges), per_request)]
+        
+        async def send(batch):
+            await self._execute(self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': batch}
+            ))
+            return sum(len(entry['values']) for entry in batch)
+        
+        # The pool bounds how many of these run at once
+        written = 0
+        for finished in asyncio.as_completed([send(batch) for batch in batches]):
+            written += await finished
+            if progress:
+                progress(written, len(values))
+        return len(batches)
+    
     async def export_data(
         self, 
         data: List[Dict[str, Any]], 
         spreadsheet_id: Optional[str] = None,
-        sheet_name: str = "Shifts Data"
+        sheet_name: str = "Shifts Data",
+        progress: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, str]:
         """Export data to Google Sheets"""
         if not self.service:
@@ -59,10 +176,10 @@ class GoogleSheetsService:
                         'title': f'Shifts Export {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
                     }
                 }
-                spreadsheet = self.service.spreadsheets().create(
+                spreadsheet = await self._execute(self.service.spreadsheets().create(
                     body=spreadsheet,
                     fields='spreadsheetId'
-                ).execute()
+                ))
                 spreadsheet_id = spreadsheet.get('spreadsheetId')
             
             # Prepare data for sheets
@@ -79,14 +196,14 @@ class GoogleSheetsService:
             # Prepare values
             values = [headers]
             for row in data:
-                values.append([str(row.get(header, '')) for header in headers])
+                values.append([self._cell(row.get(header)) for header in headers])
             
             # Clear existing data
             try:
-                self.service.spreadsheets().values().clear(
+                await self._execute(self.service.spreadsheets().values().clear(
                     spreadsheetId=spreadsheet_id,
                     range=f"{sheet_name}!A:Z"
-                ).execute()
+                ))
             except HttpError:
                 # Sheet might not exist, create it
                 requests = [{
@@ -96,18 +213,13 @@ class GoogleSheetsService:
                         }
                     }
                 }]
-                self.service.spreadsheets().batchUpdate(
+                await self._execute(self.service.spreadsheets().batchUpdate(
                     spreadsheetId=spreadsheet_id,
                     body={'requests': requests}
-                ).execute()
+                ))
             
-            # Update with new data
-            self.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=f"{sheet_name}!A1",
-                valueInputOption='RAW',
-                body={'values': values}
-            ).execute()
+            # Write new data in chunks
+            await self._write_values(spreadsheet_id, sheet_name, values, progress)
             
             return {
                 "spreadsheet_id": spreadsheet_id,
@@ -134,10 +246,10 @@ class GoogleSheetsService:
                 range_name = f"{sheet_name}!A:Z"
             
             # Get data
-            result = self.service.spreadsheets().values().get(
+            result = await self._execute(self.service.spreadsheets().values().get(
                 spreadsheetId=spreadsheet_id,
                 range=range_name
-            ).execute()
+            ))
             
             values = result.get('values', [])
             
@@ -167,4 +279,31 @@ class GoogleSheetsService:
     
     def is_available(self) -> bool:
         """Check if Google Sheets service is available"""
-        return self.service is not None 
\ No newline at end of file
+        return self.service is not None
+
+
+def get_google_sheets_service() -> GoogleSheetsService:
+    """Return the shared Google Sheets service, building it on first use
+    
+    Building reads the credentials and the API discovery document, so it is
+    done once per process. Unconfigured services are not cached, so newly
+    added credentials are picked up without a restart.
+    """
+    global _shared_service
+    service = _shared_service
+    if service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                service = GoogleSheetsService()
+                if service.is_available():
+                    _shared_service = service
+            else:
+                service = _shared_service
+    return service
+
+
+def invalidate_google_sheets_service():
+    """Drop the shared service so the next call re-reads the credentials"""
+    global _shared_service
+    with _shared_service_lock:
+        _shared_service = None
@@ -0,0 +1,283 @@
+"""Batched import pipelines for CSV uploads and Google Sheets.
+
+Rows are parsed once into a DataFrame, worker emails are resolved against the
+database with a handful of ``IN`` queries, and new rows are inserted with
+executemany batches inside a single transaction.
+"""
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.batching import LOOKUP_CHUNK_SIZE, chunks
+from app.cache import TIME_RECORDS, WORKERS, response_cache
+from app.services import rollup_service
+from app.services.presence_service import presence_index
+
+# Rows per executemany batch
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Called with the rows inserted so far and the rows to insert
+Progress = Callable[[int, int], None]
+
+
+def _column(df: pd.DataFrame, *names: str, default=None) -> pd.Series:
+    """Return the first of ``names`` present in ``df``, coalescing later aliases"""
+    result = None
+    for name in names:
+        if name in df.columns:
+            result = df[name] if result is None else result.fillna(df[name])
+    if result is None:
+        return pd.Series(default, index=df.index, dtype=object)
+    return result if default is None else result.fillna(default)
+
+
+def load_worker_index(db: Session, emails: Iterable[str]) -> Dict[str, int]:
+    """Map each known email to its worker id using chunked IN queries"""
+    index = {}
+    for chunk in chunks(list(set(emails)), LOOKUP_CHUNK_SIZE):
+        rows = db.query(models.Worker.email, models.Worker.id).filter(
+            models.Worker.email.in_(chunk)
+        ).all()
+        index.update({email: worker_id for email, worker_id in rows})
+    return index
+
+
+def bulk_insert(
+    db: Session,
+    model,
+    rows: List[Dict],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Progress] = None
+):
+    """Insert ``rows`` with one executemany per batch"""
+    inserted = 0
+    for batch in chunks(rows, batch_size):
+        db.execute(insert(model), batch)
+        inserted += len(batch)
+        if progress:
+            progress(inserted, len(rows))
+
+
+def import_workers_csv(
+    db: Session,
+    df: pd.DataFrame,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Progress] = None
+) -> Tuple[int, List[str]]:
+    """Create workers for every email in ``df`` that is not registered yet
+
+    Returns the number of valid rows and a list of per-row errors. Nothing is
+    committed if an unexpected error aborts the import. ``progress`` follows
+    the inserts of new workers.
+    """
+    errors = []
+    row_numbers = pd.Series(range(1, len(df) + 1), index=df.index)
+
+    emails = _column(df, 'Worker Email', 'email').astype('string').str.strip()
+    missing_email = emails.isna() | (emails == '')
+    for row_number in row_numbers[missing_email]:
+        errors.append(f"Missing worker email in row {row_number}")
+
+    raw_rates = _column(df, 'Hourly Rate', 'hourly_rate')
+    rates = pd.to_numeric(raw_rates, errors='coerce')
+    bad_rate = rates.isna() & raw_rates.notna() & ~missing_email
+    for row_number, value in zip(row_numbers[bad_rate], raw_rates[bad_rate]):
+        errors.append(f"Error processing row {row_number}: invalid hourly rate {value!r}")
+
+    valid = ~(missing_email | bad_rate)
+    frame = pd.DataFrame({
+        'email': emails[valid],
+        'name': _column(df, 'Worker Name', 'name', default='')[valid],
+        'position': _column(df, 'Position', 'position', default='')[valid],
+        'hourly_rate': rates[valid].fillna(0.0),
+    })
+
+    known = load_worker_index(db, frame['email'])
+    new_workers = frame[~frame['email'].isin(known.keys())].drop_duplicates('email')
+    new_workers = new_workers.assign(is_active=True)
+
+    try:
+        bulk_insert(db, models.Worker, new_workers.to_dict('records'), batch_size, progress)
+        rollup_service.record_workers_created(db, len(new_workers), len(new_workers))
+        db.commit()
+        response_cache.bump(WORKERS)
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(frame), errors
+
+
+def _parse_timestamps(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Parse a column of timestamp strings in one pass
+
+    Returns the parsed values (NaT where empty) and a mask of non-empty values
+    that could not be parsed.
+    """
+    blank = values.isna() | (values.astype('string').str.strip() == '')
+    parsed = pd.to_datetime(values.where(~blank), format=TIMESTAMP_FORMAT, errors='coerce')
+    return parsed, parsed.isna() & ~blank
+
+
+def _parse_numbers(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Parse a numeric column, treating blanks as zero"""
+    blank = values.isna() | (values.astype('string').str.strip() == '')
+    parsed = pd.to_numeric(values.where(~blank), errors='coerce')
+    return parsed.fillna(0.0), parsed.isna() & ~blank
+
+
+def load_existing_clock_ins(
+    db: Session,
+    worker_ids: Iterable[int],
+    span_start: datetime,
+    span_end: datetime
+) -> Set[Tuple[int, datetime]]:
+    """Fetch every (worker_id, clock_in) pair already stored within a date span"""
+    existing = set()
+    for chunk in chunks(list(set(worker_ids)), LOOKUP_CHUNK_SIZE):
+        rows = db.query(models.TimeRecord.worker_id, models.TimeRecord.clock_in).filter(
+            models.TimeRecord.worker_id.in_(chunk),
+            models.TimeRecord.clock_in >= span_start,
+            models.TimeRecord.clock_in <= span_end
+        ).all()
+        existing.update((worker_id, clock_in) for worker_id, clock_in in rows)
+    return existing
+
+
+def load_clocked_in_workers(db: Session, worker_ids: Iterable[int]) -> Set[int]:
+    """Fetch which of the workers already hold an active time record"""
+    clocked_in = set()
+    for chunk in chunks(list(set(worker_ids)), LOOKUP_CHUNK_SIZE):
+        rows = db.query(models.TimeRecord.worker_id).filter(
+            models.TimeRecord.worker_id.in_(chunk),
+            models.TimeRecord.status == "active"
+        ).all()
+        clocked_in.update(worker_id for worker_id, in rows)
+    return clocked_in
+
+
+def import_time_records(
+    db: Session,
+    data: List[Dict[str, Any]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Progress] = None
+) -> Tuple[int, List[str]]:
+    """Import exported time records, creating unknown workers on the way
+
+    Rows whose (worker, clock in) pair already exists, in the database or
+    earlier in ``data``, are skipped. A worker may hold one active record, so
+    active rows of workers already clocked in, in the database or earlier in
+    ``data``, are reported as errors. Returns the number of inserted records
+    and a list of per-row errors; the import runs in a single transaction.
+    ``progress`` follows the inserts of new records.
+    """
+    if not data:
+        return 0, []
+
+    df = pd.DataFrame(data)
+    # Sheet row numbers, counting the header row
+    row_numbers = pd.Series(range(2, len(df) + 2), index=df.index)
+    errors = []
+
+    def report(mask: pd.Series, message: str):
+        for row_number in row_numbers[mask]:
+            errors.append(f"Error processing row {row_number}: {message}")
+
+    emails = _column(df, 'Worker Email').astype('string').str.strip()
+    missing_email = emails.isna() | (emails == '')
+    for row_number in row_numbers[missing_email]:
+        errors.append(f"Missing worker email in row {row_number}")
+
+    clock_in, bad_clock_in = _parse_timestamps(_column(df, 'Clock In'))
+    clock_out, bad_clock_out = _parse_timestamps(_column(df, 'Clock Out'))
+    total_hours, bad_total = _parse_numbers(_column(df, 'Total Hours'))
+    overtime_hours, bad_overtime = _parse_numbers(_column(df, 'Overtime Hours'))
+    report(bad_clock_in & ~missing_email, "invalid Clock In")
+    report(bad_clock_out & ~missing_email & ~bad_clock_in, "invalid Clock Out")
+    report((bad_total | bad_overtime) & ~missing_email & ~bad_clock_in & ~bad_clock_out, "invalid hours")
+
+    invalid = missing_email | bad_clock_in | bad_clock_out | bad_total | bad_overtime
+    valid = ~invalid
+
+    try:
+        # Workers: one lookup for the whole sheet, one batched insert for new ones
+        worker_frame = pd.DataFrame({
+            'email': emails[valid],
+            'name': _column(df, 'Worker Name', default='')[valid],
+            'position': _column(df, 'Position', default='')[valid],
+        })
+        index = load_worker_index(db, worker_frame['email'])
+        new_workers = worker_frame[~worker_frame['email'].isin(index.keys())].drop_duplicates('email')
+        if len(new_workers):
+            bulk_insert(db, models.Worker, new_workers.assign(is_active=True).to_dict('records'), batch_size)
+            rollup_service.record_workers_created(db, len(new_workers), len(new_workers))
+            index.update(load_worker_index(db, new_workers['email']))
+
+        # Time records: rows without a clock in only register the worker
+        has_clock_in = valid & clock_in.notna()
+        records = pd.DataFrame({
+            'worker_id': emails[has_clock_in].map(index),
+            'clock_in': clock_in[has_clock_in],
+            'clock_out': clock_out[has_clock_in],
+            'total_hours': total_hours[has_clock_in],
+            'overtime_hours': overtime_hours[has_clock_in],
+            'status': _column(df, 'Status', default='completed')[has_clock_in].replace('', 'completed'),
+            'notes': _column(df, 'Notes', default='')[has_clock_in],
+        }).drop_duplicates(['worker_id', 'clock_in'])
+
+        if records.empty:
+            db.commit()
+            response_cache.bump(WORKERS)
+            return 0, errors
+
+        existing = load_existing_clock_ins(
+            db,
+            records['worker_id'].tolist(),
+            records['clock_in'].min().to_pydatetime(),
+            records['clock_in'].max().to_pydatetime()
+        )
+
+        active = records['status'] == "active"
+        clocked_in = load_clocked_in_workers(db, records.loc[active, 'worker_id'].tolist()) if active.any() else set()
+
+        new_records = []
+        for row_number, worker_id, record_clock_in, record_clock_out, total, overtime, record_status, notes in zip(
+            row_numbers[records.index], records['worker_id'], records['clock_in'], records['clock_out'],
+            records['total_hours'], records['overtime_hours'], records['status'], records['notes']
+        ):
+            record_clock_in = record_clock_in.to_pydatetime()
+            if (worker_id, record_clock_in) in existing:
+                continue
+            if record_status == "active":
+                if worker_id in clocked_in:
+                    errors.append(f"Error processing row {row_number}: worker is already clocked in")
+                    continue
+                clocked_in.add(worker_id)
+            new_records.append({
+                'worker_id': int(worker_id),
+                'clock_in': record_clock_in,
+                'clock_out': None if pd.isna(record_clock_out) else record_clock_out.to_pydatetime(),
+                'total_hours': float(total),
+                'overtime_hours': float(overtime),
+                'status': record_status,
+                'notes': notes,
+            })
+
+        bulk_insert(db, models.TimeRecord, new_records, batch_size, progress)
+        rollup_service.record_time_records_added(db, new_records)
+        db.commit()
+        # Imported records may be active
+        presence_index.invalidate()
+        response_cache.bump(WORKERS, TIME_RECORDS)
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(new_records), errors
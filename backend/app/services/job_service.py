@@ -0,0 +1,300 @@
+"""Background jobs for long-running imports and exports, queued in SQLite.
+
+Jobs are rows of the ``jobs`` table, so no broker is needed: submitting one
+inserts a ``queued`` row and returns at once. ``JOB_WORKERS`` threads take
+the oldest queued job by switching it to ``running`` with a conditional
+UPDATE, so each job is claimed once, run its handler with their own session
+and store its result or error. Idle workers wake when a job is submitted,
+and otherwise look for queued jobs every ``JOB_POLL_SECONDS``.
+
+A claimed job is leased to its process, which renews ``heartbeat_at`` every
+``JOB_HEARTBEAT_SECONDS``. Jobs whose heartbeat is older than
+``JOB_LEASE_SECONDS`` belong to a process that died, and are queued again,
+up to ``JOB_MAX_ATTEMPTS`` tries in all; jobs of live processes, however
+many there are, are left alone. Handlers write in a single transaction and
+skip rows that already exist, so such a job is restarted from the beginning
+rather than resumed.
+
+Row counts are kept in memory while a job runs, because an import holds
+SQLite's write lock until it commits, and are stored when it finishes.
+Database errors, such as the lock outlasting ``busy_timeout``, are logged
+and retried after a pause rather than stopping the worker.
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Jobs run at once, 0 leaves submitted jobs queued
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds an idle worker waits before looking for queued jobs again
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+# Tries before a job interrupted by crashes is failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Seconds between lease renewals, and without one before a running job is taken to be orphaned
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobProgress:
+    """Row counts reported by a running handler, called as ``progress(processed, total)``"""
+
+    def __init__(self):
+        self.processed_rows = 0
+        self.total_rows: Optional[int] = None
+
+    def __call__(self, processed_rows: int, total_rows: Optional[int] = None):
+        self.processed_rows = processed_rows
+        if total_rows is not None:
+            self.total_rows = total_rows
+
+
+# Called with a session, the job's payload and its progress; returns the JSON result
+JobHandler = Callable[[Session, Dict[str, Any], JobProgress], Dict[str, Any]]
+
+
+class JobQueue:
+    """Worker threads running the queued jobs of the database"""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS
+    ):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lease_seconds = lease_seconds
+        # Marks the jobs this process holds the lease of
+        self.owner = uuid.uuid4().hex
+        self._handlers: Dict[str, JobHandler] = {}
+        self._progress: Dict[int, JobProgress] = {}
+        self._threads = []
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        # Bumped on submit, so a worker that just found nothing does not sleep through it
+        self._generation = 0
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    def submit(self, db: Session, kind: str, payload: Dict[str, Any]) -> models.Job:
+        """Queue a job; ``payload`` must be JSON serialisable"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = models.Job(kind=kind, status=QUEUED, payload=json.dumps(payload), attempts=0, processed_rows=0)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        with self._wake:
+            self._generation += 1
+            self._wake.notify()
+        return job
+
+    def status(self, db: Session, job_id: int) -> Optional[Dict[str, Any]]:
+        """The job as stored, with live row counts while this process runs it"""
+        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        if job is None:
+            return None
+        status = {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "attempts": job.attempts,
+            "processed_rows": job.processed_rows,
+            "total_rows": job.total_rows,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+        with self._lock:
+            progress = self._progress.get(job_id)
+        if progress is not None and job.status == RUNNING:
+            status["processed_rows"] = progress.processed_rows
+            status["total_rows"] = progress.total_rows
+        return status
+
+    def recover(self, db: Session) -> Dict[str, int]:
+        """Queue running jobs whose lease expired again, failing those out of attempts"""
+        now = datetime.now()
+        orphaned = (
+            models.Job.status == RUNNING,
+            or_(
+                models.Job.heartbeat_at.is_(None),
+                models.Job.heartbeat_at < now - timedelta(seconds=self.lease_seconds)
+            )
+        )
+        failed = db.execute(
+            update(models.Job)
+            .where(*orphaned, models.Job.attempts >= self.max_attempts)
+            .values(status=FAILED, error="Interrupted too many times", finished_at=now, owner=None)
+        ).rowcount
+        requeued = db.execute(
+            update(models.Job).where(*orphaned).values(status=QUEUED, owner=None)
+        ).rowcount
+        db.commit()
+        return {"requeued": requeued, "failed": failed}
+
+    def start(self):
+        """Requeue orphaned jobs, then start the workers and the thread renewing
+        leases and recovering jobs orphaned later"""
+        self._stopping = False
+        if not self.workers:
+            return
+        try:
+            with SessionLocal() as db:
+                self.recover(db)
+        except Exception:
+            logger.exception("Recovering orphaned jobs failed")
+        threads = [threading.Thread(target=self._keep_leases, name="job-leases", daemon=True)]
+        threads += [
+            threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            for number in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop taking jobs; a job still running is restarted once its lease expires"""
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _pause(self, seconds: float):
+        with self._wake:
+            if not self._stopping:
+                self._wake.wait(seconds)
+
+    def _keep_leases(self):
+        while not self._stopping:
+            try:
+                with self._lock:
+                    running = list(self._progress)
+                with SessionLocal() as db:
+                    if running:
+                        db.execute(
+                            update(models.Job)
+                            .where(models.Job.id.in_(running), models.Job.owner == self.owner)
+                            .values(heartbeat_at=datetime.now())
+                        )
+                        db.commit()
+                    self.recover(db)
+            except Exception:
+                logger.exception("Renewing job leases failed")
+            self._pause(self.heartbeat_seconds)
+
+    def _claim(self) -> Optional[Row]:
+        with SessionLocal() as db:
+            while True:
+                job = db.execute(
+                    select(models.Job.id, models.Job.kind, models.Job.payload)
+                    .where(models.Job.status == QUEUED)
+                    .order_by(models.Job.id)
+                    .limit(1)
+                ).first()
+                if job is None:
+                    return None
+                # Another worker may have claimed it since the SELECT
+                now = datetime.now()
+                claimed = db.execute(
+                    update(models.Job)
+                    .where(models.Job.id == job.id, models.Job.status == QUEUED)
+                    .values(
+                        status=RUNNING,
+                        owner=self.owner,
+                        heartbeat_at=now,
+                        attempts=models.Job.attempts + 1,
+                        started_at=now,
+                        processed_rows=0,
+                        total_rows=None
+                    )
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return job
+
+    def _work(self):
+        while not self._stopping:
+            with self._wake:
+                generation = self._generation
+            try:
+                job = self._claim()
+            except Exception:
+                logger.exception("Claiming a job failed")
+                self._pause(self.poll_seconds)
+                continue
+            if job is None:
+                with self._wake:
+                    if self._generation == generation and not self._stopping:
+                        self._wake.wait(self.poll_seconds)
+                continue
+            self._run(job)
+
+    def _run(self, job: Row):
+        progress = JobProgress()
+        with self._lock:
+            self._progress[job.id] = progress
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job.kind}")
+            with SessionLocal() as db:
+                result = handler(db, json.loads(job.payload), progress)
+            values = {"status": SUCCEEDED, "result": json.dumps(result, default=str), "error": None}
+        except Exception as e:
+            values = {"status": FAILED, "error": str(e) or type(e).__name__}
+
+        # The lease is renewed until the outcome is stored
+        while True:
+            try:
+                with SessionLocal() as db:
+                    # Only while the lease is still ours; an expired one is another process's now
+                    db.execute(
+                        update(models.Job).where(models.Job.id == job.id, models.Job.owner == self.owner).values(
+                            processed_rows=progress.processed_rows,
+                            total_rows=progress.total_rows,
+                            finished_at=datetime.now(),
+                            owner=None,
+                            **values
+                        )
+                    )
+                    db.commit()
+                break
+            except Exception:
+                logger.exception("Storing the outcome of job %s failed", job.id)
+                if self._stopping:
+                    break
+                self._pause(self.poll_seconds)
+        with self._lock:
+            del self._progress[job.id]
+
+
+job_queue = JobQueue()
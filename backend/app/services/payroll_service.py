@@ -0,0 +1,147 @@
+"""Payroll for a pay period.
+
+The period's completed time records are read in one query into a DataFrame
+and everything else is grouped, vectorised arithmetic:
+
+- hours are summed per worker and day (the day a record was clocked in on);
+- hours beyond ``DAILY_OVERTIME_HOURS`` in a day are daily overtime;
+- the remaining hours beyond ``WEEKLY_OVERTIME_HOURS`` in a Monday-based
+  week are weekly overtime, so no hour counts as overtime twice;
+- hours worked on a holiday earn a premium of ``HOLIDAY_MULTIPLIER - 1``
+  times the rate on top of their regular or overtime pay.
+
+Weeks are cut at the period boundaries, so pay periods should start on a
+Monday for weekly overtime to cover whole weeks.
+"""
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Set
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.clock_service import STANDARD_HOURS
+
+DAILY_OVERTIME_HOURS = float(os.getenv("DAILY_OVERTIME_HOURS", str(STANDARD_HOURS)))
+WEEKLY_OVERTIME_HOURS = float(os.getenv("WEEKLY_OVERTIME_HOURS", "40"))
+OVERTIME_MULTIPLIER = float(os.getenv("OVERTIME_MULTIPLIER", "1.5"))
+HOLIDAY_MULTIPLIER = float(os.getenv("HOLIDAY_MULTIPLIER", "1.5"))
+
+PAYROLL_COLUMNS = [
+    "regular_hours", "daily_overtime_hours", "weekly_overtime_hours", "holiday_hours",
+    "regular_pay", "overtime_pay", "holiday_pay", "gross_pay"
+]
+
+
+def holiday_dates(holidays: Iterable[models.Holiday], period_start: date, period_end: date) -> Set[date]:
+    """Holiday dates within the period, repeating recurring holidays every year"""
+    dates = set()
+    for holiday in holidays:
+        day = holiday.date.date()
+        if not holiday.is_recurring:
+            dates.add(day)
+            continue
+        for year in range(period_start.year, period_end.year + 1):
+            try:
+                dates.add(day.replace(year=year))
+            except ValueError:
+                # 29 February outside leap years
+                pass
+    return {day for day in dates if period_start <= day <= period_end}
+
+
+def load_hours(db: Session, period_start: date, period_end: date, worker_id: Optional[int] = None) -> pd.DataFrame:
+    """Completed records of the period as worker_id, day and hours columns"""
+    record = models.TimeRecord
+    query = select(
+        record.worker_id,
+        # Parsed by pandas in one pass rather than per row
+        type_coerce(record.clock_in, String),
+        record.total_hours
+    ).where(
+        record.clock_in >= period_start,
+        record.clock_in < period_end + timedelta(days=1),
+        record.status == "completed"
+    )
+    if worker_id is not None:
+        query = query.where(record.worker_id == worker_id)
+
+    result = db.connection().execute(query)
+    try:
+        # Plain DBAPI tuples; building a Row per record would double the fetch time
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+
+    frame = pd.DataFrame.from_records(rows, columns=["worker_id", "clock_in", "hours"])
+    frame["day"] = pd.to_datetime(frame["clock_in"], format="ISO8601").dt.normalize()
+    frame["hours"] = frame["hours"].astype(float).fillna(0.0)
+    return frame[["worker_id", "day", "hours"]]
+
+
+def compute_payroll(hours: pd.DataFrame, rates: pd.Series, holidays: Set[date]) -> pd.DataFrame:
+    """Hours and pay per worker from worker_id/day/hours rows and hourly rates by worker id"""
+    daily = hours.groupby(["worker_id", "day"], sort=False, as_index=False)["hours"].sum()
+
+    daily_overtime = np.maximum(daily["hours"].to_numpy() - DAILY_OVERTIME_HOURS, 0.0)
+    daily["daily_overtime_hours"] = daily_overtime
+    daily["straight_hours"] = daily["hours"] - daily_overtime
+    daily["holiday_hours"] = daily["hours"].where(
+        daily["day"].isin(pd.to_datetime(sorted(holidays))), 0.0
+    )
+    # Monday of each day's week
+    daily["week"] = daily["day"] - pd.to_timedelta(daily["day"].dt.weekday, unit="D")
+
+    weekly = daily.groupby(["worker_id", "week"], sort=False)["straight_hours"].sum()
+    weekly_overtime = np.maximum(weekly - WEEKLY_OVERTIME_HOURS, 0.0).groupby(level="worker_id").sum()
+
+    payroll = daily.groupby("worker_id")[["hours", "straight_hours", "daily_overtime_hours", "holiday_hours"]].sum()
+    payroll["weekly_overtime_hours"] = weekly_overtime
+    payroll["regular_hours"] = payroll["straight_hours"] - payroll["weekly_overtime_hours"]
+
+    rate = rates.reindex(payroll.index).fillna(0.0)
+    overtime_hours = payroll["daily_overtime_hours"] + payroll["weekly_overtime_hours"]
+    payroll["hourly_rate"] = rate
+    payroll["regular_pay"] = payroll["regular_hours"] * rate
+    payroll["overtime_pay"] = overtime_hours * rate * OVERTIME_MULTIPLIER
+    payroll["holiday_pay"] = payroll["holiday_hours"] * rate * (HOLIDAY_MULTIPLIER - 1)
+    payroll["gross_pay"] = payroll["regular_pay"] + payroll["overtime_pay"] + payroll["holiday_pay"]
+    payroll[PAYROLL_COLUMNS] = payroll[PAYROLL_COLUMNS].round(2)
+    return payroll
+
+
+def payroll_report(
+    db: Session,
+    period_start: date,
+    period_end: date,
+    worker_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Payroll of every worker with completed records in the period
+
+    Returned as plain data for ``schemas.PayrollReport``, so the entries are
+    only validated once, by the response model.
+    """
+    hours = load_hours(db, period_start, period_end, worker_id)
+    holidays = holiday_dates(db.query(models.Holiday).all(), period_start, period_end)
+
+    worker_query = select(models.Worker.id, models.Worker.name, models.Worker.hourly_rate)
+    if worker_id is not None:
+        worker_query = worker_query.where(models.Worker.id == worker_id)
+    workers = pd.DataFrame(
+        db.execute(worker_query).all(), columns=["worker_id", "worker_name", "hourly_rate"]
+    ).set_index("worker_id")
+
+    payroll = compute_payroll(hours, workers["hourly_rate"].astype(float), holidays)
+    payroll = payroll.join(workers["worker_name"], how="inner").sort_index().reset_index()
+
+    return {
+        "period_start": period_start,
+        "period_end": period_end,
+        "holidays": sorted(holidays),
+        "total_hours": round(float(payroll["hours"].sum()), 2),
+        "total_gross_pay": round(float(payroll["gross_pay"].sum()), 2),
+        "entries": payroll[["worker_id", "worker_name", "hourly_rate", *PAYROLL_COLUMNS]].to_dict("records")
+    }
@@ -0,0 +1,129 @@
+"""Process-local index of who is clocked in.
+
+Maps each clocked-in worker to their active time record, so the active
+listings and the dashboard count are answered from memory instead of
+querying ``time_records``. Clock-ins always ask the database. The database stays the
+source of truth: the index is loaded from the active records, updated by this
+process's clock handlers once they have committed, and reloaded when it is
+invalidated or older than ``PRESENCE_TTL`` seconds. The TTL bounds how long
+writes made by other processes go unnoticed.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Seconds before the index is reloaded from the database, 0 disables it
+PRESENCE_TTL = float(os.getenv("PRESENCE_TTL", "30"))
+
+
+class Presence(NamedTuple):
+    record_id: int
+    clock_in: datetime
+    on_break: bool = False
+
+
+class PresenceIndex:
+    """Worker id to active record, shared by the request threads"""
+
+    def __init__(self, ttl: float = PRESENCE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[int, Presence] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # Changes made while a load is reading the database, replayed on top of it
+        self._journal: Optional[List] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return self.enabled and (loaded_at is None or time.monotonic() - loaded_at > self.ttl)
+
+    def load(self, db: Session):
+        """Replace the index with the active records in the database"""
+        with self._load_lock:
+            if not self.stale:
+                return
+            with self._lock:
+                self._journal = []
+            try:
+                rows = db.query(
+                    models.TimeRecord.worker_id,
+                    models.TimeRecord.id,
+                    models.TimeRecord.clock_in,
+                    models.TimeRecord.break_start,
+                    models.TimeRecord.break_end
+                ).filter(models.TimeRecord.status == "active").all()
+            except Exception:
+                with self._lock:
+                    self._journal = None
+                raise
+
+            entries = {
+                worker_id: Presence(record_id, clock_in, break_start is not None and break_end is None)
+                for worker_id, record_id, clock_in, break_start, break_end in rows
+            }
+            with self._lock:
+                for worker_id, presence in self._journal:
+                    if presence is None:
+                        entries.pop(worker_id, None)
+                    else:
+                        entries[worker_id] = presence
+                self._entries = entries
+                self._journal = None
+                self._loaded_at = time.monotonic()
+
+    def ensure(self, db: Session) -> bool:
+        """Reload the index if needed; returns whether it can be used"""
+        if self.stale:
+            self.load(db)
+        return self.enabled
+
+    def invalidate(self):
+        """Force a reload on next use, e.g. after bulk writes"""
+        self._loaded_at = None
+
+    def _set(self, worker_id: int, presence: Optional[Presence]):
+        with self._lock:
+            if presence is None:
+                self._entries.pop(worker_id, None)
+            else:
+                self._entries[worker_id] = presence
+            if self._journal is not None:
+                self._journal.append((worker_id, presence))
+
+    def clocked_in(self, worker_id: int, record_id: int, clock_in: datetime):
+        self._set(worker_id, Presence(record_id, clock_in))
+
+    def clocked_out(self, worker_id: int):
+        self._set(worker_id, None)
+
+    def break_changed(self, worker_id: int, on_break: bool):
+        presence = self._entries.get(worker_id)
+        if presence is not None:
+            self._set(worker_id, presence._replace(on_break=on_break))
+
+    def get(self, worker_id: int) -> Optional[Presence]:
+        return self._entries.get(worker_id)
+
+    def __contains__(self, worker_id: int) -> bool:
+        return worker_id in self._entries
+
+    def count(self) -> int:
+        return len(self._entries)
+
+    def record_ids(self) -> List[int]:
+        return [presence.record_id for presence in list(self._entries.values())]
+
+
+presence_index = PresenceIndex()
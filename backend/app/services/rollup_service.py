@@ -0,0 +1,344 @@
+"""Incrementally maintained dashboard and report rollups.
+
+The dashboard used to count workers and sum every time record since midnight
+on each request. Instead, the write paths (clock-in, clock-out, worker
+create/deactivate) adjust a small set of counters in the same transaction, so
+reading the dashboard is a couple of primary key lookups.
+
+Completed records are likewise summed into ``hours_summaries`` per day,
+worker and position when they are clocked out or imported, and reports roll
+that table up by week, month or position without reading ``time_records``.
+
+Run ``python -m app.services.rollup_service`` from the backend directory to
+recompute all rollups from ``workers`` and ``time_records`` if they ever drift.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.batching import LOOKUP_CHUNK_SIZE, chunks
+
+TOTAL_WORKERS = "total_workers"
+ACTIVE_WORKERS = "active_workers"
+WORKERS_CLOCKED_IN = "workers_clocked_in"
+
+COUNTER_NAMES = (TOTAL_WORKERS, ACTIVE_WORKERS, WORKERS_CLOCKED_IN)
+
+SUMMARY_PERIOD_COLUMNS = {
+    schemas.SummaryPeriod.DAY: models.HoursSummary.day,
+    schemas.SummaryPeriod.WEEK: models.HoursSummary.week_start,
+    schemas.SummaryPeriod.MONTH: models.HoursSummary.month_start,
+}
+
+
+def _insert_ignore(db: Session, model, values: Dict):
+    """Insert a row unless its primary key already exists"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        pk = {col.name: values[col.name] for col in model.__table__.primary_key}
+        if db.get(model, tuple(pk.values())) is None:
+            db.add(model(**values))
+            db.flush()
+        return
+    db.execute(insert(model).values(**values).on_conflict_do_nothing())
+
+
+def _bump_counter(db: Session, name: str, delta: int):
+    if not delta:
+        return
+    _insert_ignore(db, models.StatsCounter, {"name": name, "value": 0})
+    db.execute(
+        update(models.StatsCounter)
+        .where(models.StatsCounter.name == name)
+        .values(value=models.StatsCounter.value + delta)
+    )
+
+
+def _bump_day(db: Session, day: date, clock_ins: int = 0, total_hours: float = 0.0, overtime_hours: float = 0.0):
+    if not (clock_ins or total_hours or overtime_hours):
+        return
+    _insert_ignore(db, models.DailyRollup, {
+        "day": day, "clock_ins": 0, "total_hours": 0.0, "overtime_hours": 0.0
+    })
+    db.execute(
+        update(models.DailyRollup)
+        .where(models.DailyRollup.day == day)
+        .values(
+            clock_ins=models.DailyRollup.clock_ins + clock_ins,
+            total_hours=models.DailyRollup.total_hours + total_hours,
+            overtime_hours=models.DailyRollup.overtime_hours + overtime_hours,
+        )
+    )
+
+
+def _bump_summary(
+    db: Session,
+    day: date,
+    worker_id: int,
+    position: Optional[str],
+    record_count: int,
+    total_hours: float,
+    overtime_hours: float
+):
+    position = position or ""
+    _insert_ignore(db, models.HoursSummary, {
+        "day": day, "worker_id": worker_id, "position": position,
+        "week_start": day - timedelta(days=day.weekday()), "month_start": day.replace(day=1),
+        "record_count": 0, "total_hours": 0.0, "overtime_hours": 0.0
+    })
+    summary = models.HoursSummary
+    db.execute(
+        update(summary)
+        .where(summary.day == day, summary.worker_id == worker_id, summary.position == position)
+        .values(
+            record_count=summary.record_count + record_count,
+            total_hours=summary.total_hours + total_hours,
+            overtime_hours=summary.overtime_hours + overtime_hours,
+        )
+    )
+
+
+def _worker_positions(db: Session, worker_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    worker_ids = list(worker_ids)
+    positions = {}
+    for chunk in chunks(worker_ids, LOOKUP_CHUNK_SIZE):
+        positions.update(db.execute(
+            select(models.Worker.id, models.Worker.position).where(models.Worker.id.in_(chunk))
+        ).all())
+    return positions
+
+
+def record_clock_in(db: Session, record: models.TimeRecord):
+    """Account for a new active time record"""
+    _bump_counter(db, WORKERS_CLOCKED_IN, 1)
+    _bump_day(db, record.clock_in.date(), clock_ins=1)
+
+
+def record_clock_out(db: Session, record: models.TimeRecord):
+    """Account for an active time record that has just been completed"""
+    _bump_counter(db, WORKERS_CLOCKED_IN, -1)
+    _bump_day(
+        db,
+        record.clock_in.date(),
+        total_hours=record.total_hours or 0.0,
+        overtime_hours=record.overtime_hours or 0.0,
+    )
+    _bump_summary(
+        db,
+        record.clock_in.date(),
+        record.worker_id,
+        _worker_positions(db, [record.worker_id]).get(record.worker_id),
+        1,
+        record.total_hours or 0.0,
+        record.overtime_hours or 0.0,
+    )
+
+
+def record_time_records_added(db: Session, records: Iterable[Dict]):
+    """Account for time records inserted in bulk (e.g. imports)"""
+    per_day: Dict[date, list] = {}
+    per_worker_day: Dict[Tuple[date, int], list] = {}
+    clocked_in = 0
+    for record in records:
+        day = record["clock_in"].date()
+        totals = per_day.setdefault(day, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += record.get("total_hours") or 0.0
+        totals[2] += record.get("overtime_hours") or 0.0
+        if record.get("status", "active") == "active":
+            clocked_in += 1
+        else:
+            # Active records are summarised when they are clocked out
+            totals = per_worker_day.setdefault((day, record["worker_id"]), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += record.get("total_hours") or 0.0
+            totals[2] += record.get("overtime_hours") or 0.0
+    for day, (clock_ins, total_hours, overtime_hours) in per_day.items():
+        _bump_day(db, day, clock_ins, total_hours, overtime_hours)
+    _bump_counter(db, WORKERS_CLOCKED_IN, clocked_in)
+
+    positions = _worker_positions(db, {worker_id for _, worker_id in per_worker_day})
+    for (day, worker_id), (record_count, total_hours, overtime_hours) in per_worker_day.items():
+        _bump_summary(db, day, worker_id, positions.get(worker_id), record_count, total_hours, overtime_hours)
+
+
+def record_worker_created(db: Session, worker: models.Worker):
+    """Account for a newly created worker"""
+    _bump_counter(db, TOTAL_WORKERS, 1)
+    if worker.is_active is not False:
+        _bump_counter(db, ACTIVE_WORKERS, 1)
+
+
+def record_workers_created(db: Session, total: int, active: int):
+    """Account for workers inserted in bulk (e.g. imports)"""
+    _bump_counter(db, TOTAL_WORKERS, total)
+    _bump_counter(db, ACTIVE_WORKERS, active)
+
+
+def record_worker_active_changed(db: Session, was_active: bool, is_active: bool):
+    """Account for a worker being deactivated or reactivated"""
+    if bool(was_active) != bool(is_active):
+        _bump_counter(db, ACTIVE_WORKERS, 1 if is_active else -1)
+
+
+def get_counters(db: Session) -> Dict[str, int]:
+    """Return all global counters, defaulting missing ones to zero"""
+    rows = db.query(models.StatsCounter.name, models.StatsCounter.value).all()
+    counters = {name: 0 for name in COUNTER_NAMES}
+    counters.update({name: value for name, value in rows})
+    return counters
+
+
+def get_day(db: Session, day: date) -> models.DailyRollup:
+    """Return the rollup for a day, or an empty one if nothing happened yet"""
+    rollup = db.get(models.DailyRollup, day)
+    if rollup is None:
+        rollup = models.DailyRollup(day=day, clock_ins=0, total_hours=0.0, overtime_hours=0.0)
+    return rollup
+
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """Recompute every rollup from the workers and time_records tables"""
+    total_workers = db.query(func.count(models.Worker.id)).scalar() or 0
+    active_workers = db.query(func.count(models.Worker.id)).filter(
+        models.Worker.is_active == True
+    ).scalar() or 0
+    workers_clocked_in = db.query(func.count(models.TimeRecord.id)).filter(
+        models.TimeRecord.status == "active"
+    ).scalar() or 0
+
+    day = func.date(models.TimeRecord.clock_in)
+    daily = db.query(
+        day,
+        func.count(models.TimeRecord.id),
+        func.coalesce(func.sum(models.TimeRecord.total_hours), 0.0),
+        func.coalesce(func.sum(models.TimeRecord.overtime_hours), 0.0),
+    ).group_by(day).all()
+
+    summaries = db.execute(
+        select(
+            day,
+            models.TimeRecord.worker_id,
+            func.coalesce(models.Worker.position, ""),
+            func.count(models.TimeRecord.id),
+            func.coalesce(func.sum(models.TimeRecord.total_hours), 0.0),
+            func.coalesce(func.sum(models.TimeRecord.overtime_hours), 0.0),
+        )
+        .join(models.Worker, models.Worker.id == models.TimeRecord.worker_id)
+        .where(models.TimeRecord.status != "active")
+        .group_by(day, models.TimeRecord.worker_id, models.Worker.position)
+    ).all()
+
+    db.query(models.StatsCounter).delete()
+    db.query(models.DailyRollup).delete()
+    db.query(models.HoursSummary).delete()
+    db.add_all([
+        models.StatsCounter(name=TOTAL_WORKERS, value=total_workers),
+        models.StatsCounter(name=ACTIVE_WORKERS, value=active_workers),
+        models.StatsCounter(name=WORKERS_CLOCKED_IN, value=workers_clocked_in),
+    ])
+    for row_day, clock_ins, total_hours, overtime_hours in daily:
+        if isinstance(row_day, str):
+            row_day = date.fromisoformat(row_day)
+        db.add(models.DailyRollup(
+            day=row_day,
+            clock_ins=clock_ins,
+            total_hours=total_hours,
+            overtime_hours=overtime_hours,
+        ))
+
+    summary_rows = []
+    for row_day, worker_id, position, record_count, total_hours, overtime_hours in summaries:
+        if isinstance(row_day, str):
+            row_day = date.fromisoformat(row_day)
+        summary_rows.append({
+            "day": row_day, "worker_id": worker_id, "position": position,
+            "week_start": row_day - timedelta(days=row_day.weekday()), "month_start": row_day.replace(day=1),
+            "record_count": record_count, "total_hours": total_hours, "overtime_hours": overtime_hours
+        })
+    if summary_rows:
+        db.execute(insert(models.HoursSummary), summary_rows)
+    db.commit()
+
+    return {
+        "days": len(daily),
+        "summaries": len(summary_rows),
+        "total_workers": total_workers,
+        "workers_clocked_in": workers_clocked_in
+    }
+
+
+def ensure_rollups(db: Session):
+    """Build the rollups once for databases created before they existed"""
+    missing_summaries = (
+        db.query(models.HoursSummary).first() is None
+        and db.query(models.TimeRecord.id).filter(models.TimeRecord.status != "active").first() is not None
+    )
+    if missing_summaries or db.query(models.StatsCounter).first() is None:
+        rebuild_rollups(db)
+
+
+def get_hours_summary(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    period: schemas.SummaryPeriod = schemas.SummaryPeriod.WEEK,
+    group: schemas.SummaryGroup = schemas.SummaryGroup.POSITION,
+    position: Optional[str] = None
+) -> List[schemas.HoursSummaryRow]:
+    """Roll the daily summaries between two days up by period and position or worker"""
+    summary = models.HoursSummary
+    period_start = SUMMARY_PERIOD_COLUMNS[period]
+    group_columns = {
+        schemas.SummaryGroup.POSITION: [summary.position],
+        schemas.SummaryGroup.WORKER: [summary.worker_id, summary.position],
+        schemas.SummaryGroup.ALL: [],
+    }[group]
+
+    query = select(
+        period_start,
+        *group_columns,
+        func.sum(summary.record_count),
+        func.sum(summary.total_hours),
+        func.sum(summary.overtime_hours),
+    ).where(
+        summary.day >= date_from,
+        summary.day <= date_to
+    ).group_by(period_start, *group_columns).order_by(period_start, *group_columns)
+    if position is not None:
+        query = query.where(summary.position == position)
+
+    rows = []
+    for row in db.execute(query):
+        values = dict(zip(["period_start", *[column.key for column in group_columns]], row))
+        record_count, total_hours, overtime_hours = row[-3:]
+        if isinstance(values["period_start"], str):
+            values["period_start"] = date.fromisoformat(values["period_start"])
+        if "position" in values:
+            values["position"] = values["position"] or None
+        rows.append(schemas.HoursSummaryRow(
+            **values,
+            record_count=record_count,
+            total_hours=round(total_hours, 2),
+            overtime_hours=round(overtime_hours, 2)
+        ))
+    return rows
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal, engine, Base
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        result = rebuild_rollups(session)
+        print(f"Rebuilt rollups at {datetime.now():%Y-%m-%d %H:%M:%S}: {result}")
+    finally:
+        session.close()
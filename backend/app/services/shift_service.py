@@ -0,0 +1,556 @@
+"""Shift interval overlap detection and bulk scheduling.
+
+Two shifts of one worker overlap when each starts before the other ends. The
+lookup is backed by the ``(worker_id, start_time, end_time)`` index, and shift
+length is capped at ``MAX_SHIFT_DURATION``. That lets every query bound
+``start_time`` from both sides, so it reads a short index range next to the
+new interval instead of the worker's whole history.
+
+Bulk scheduling expands recurring shifts into a DataFrame of occurrences,
+checks all of them for conflicts in one pass and inserts the rest in batches.
+
+A recurring shift stored on its own is a template instead: listings expand it
+lazily for the requested window, applying any per-occurrence overrides, so
+its future occurrences never have to be stored.
+"""
+import calendar
+import heapq
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app import models, schemas
+from app.batching import LOOKUP_CHUNK_SIZE, chunks
+from app.schemas import RecurrencePattern
+from app.services.import_service import IMPORT_BATCH_SIZE, bulk_insert
+
+MAX_SHIFT_DURATION = timedelta(hours=int(os.getenv("MAX_SHIFT_HOURS", "24")))
+
+# Most shifts a single bulk request may expand into
+BULK_SHIFT_LIMIT = int(os.getenv("BULK_SHIFT_LIMIT", "50000"))
+
+# Days of occurrences checked for overlaps when an open-ended recurring shift is saved
+RECURRENCE_CHECK_DAYS = int(os.getenv("RECURRENCE_CHECK_DAYS", "365"))
+
+# Days between occurrences of fixed-length recurrences
+RECURRENCE_STEP_DAYS = {"daily": 1, "weekly": 7}
+
+Interval = Tuple[int, datetime, datetime]
+
+# Shifts expanded lazily by listings rather than read as stored rows
+TEMPLATE_FILTER = and_(models.Shift.is_recurring.is_(True), models.Shift.recurrence_pattern.isnot(None))
+
+# Override fields that replace the template's value when set
+OVERRIDE_FIELDS = ("start_time", "end_time", "status", "notes")
+
+
+def validate_interval(start_time: datetime, end_time: datetime) -> Optional[str]:
+    """Return why a shift interval is invalid, or None"""
+    if end_time <= start_time:
+        return "Shift end time must be after its start time"
+    if end_time - start_time > MAX_SHIFT_DURATION:
+        return f"Shifts cannot be longer than {MAX_SHIFT_DURATION.total_seconds() / 3600:g} hours"
+    return None
+
+
+def _overlap_filter(query, start_time: datetime, end_time: datetime):
+    # start_time is bounded on both sides, so this is an index range scan.
+    # Templates are matched through their occurrences instead
+    return query.filter(
+        models.Shift.start_time > start_time - MAX_SHIFT_DURATION,
+        models.Shift.start_time < end_time,
+        models.Shift.end_time > start_time,
+        models.Shift.status != "cancelled",
+        ~TEMPLATE_FILTER
+    )
+
+
+def _overlapping_occurrences(
+    db: Session,
+    worker_ids: Sequence[int],
+    start_time: datetime,
+    end_time: datetime,
+    exclude_id: Optional[int] = None
+) -> Iterator[schemas.Shift]:
+    """Non-cancelled template occurrences of the workers overlapping the interval"""
+    occurrences = iter_occurrences(
+        db, (start_time - MAX_SHIFT_DURATION).date(), end_time.date(), worker_ids=worker_ids
+    )
+    for occurrence in occurrences:
+        if (
+            occurrence.id != exclude_id
+            and occurrence.status != "cancelled"
+            and occurrence.start_time < end_time
+            and occurrence.end_time > start_time
+        ):
+            yield occurrence
+
+
+def find_overlapping_shift(
+    db: Session,
+    worker_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_id: Optional[int] = None
+):
+    """Return a non-cancelled shift or template occurrence of the worker
+    overlapping the interval"""
+    query = _overlap_filter(
+        db.query(models.Shift).filter(models.Shift.worker_id == worker_id),
+        start_time,
+        end_time
+    )
+    if exclude_id is not None:
+        query = query.filter(models.Shift.id != exclude_id)
+    shift = query.first()
+    if shift is not None:
+        return shift
+    return next(_overlapping_occurrences(db, [worker_id], start_time, end_time, exclude_id), None)
+
+
+def find_conflicts(db: Session, intervals: Sequence[Interval], exclude_id: Optional[int] = None) -> Set[int]:
+    """Return the positions in ``intervals`` that overlap a stored shift, a
+    template occurrence or an earlier interval in the sequence
+
+    Stored shifts and templates are fetched for the whole span with one query
+    per chunk of workers and then checked in memory by bisection, so the
+    number of queries does not depend on the number of intervals checked.
+    The shift ``exclude_id`` and its occurrences are ignored.
+    """
+    if not intervals:
+        return set()
+
+    span_start = min(start for _, start, _ in intervals)
+    span_end = max(end for _, _, end in intervals)
+    worker_ids = list({worker_id for worker_id, _, _ in intervals})
+
+    booked: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for chunk in chunks(worker_ids, LOOKUP_CHUNK_SIZE):
+        query = _overlap_filter(
+            db.query(models.Shift.worker_id, models.Shift.start_time, models.Shift.end_time).filter(
+                models.Shift.worker_id.in_(chunk)
+            ),
+            span_start,
+            span_end
+        )
+        if exclude_id is not None:
+            query = query.filter(models.Shift.id != exclude_id)
+        for worker_id, shift_start, shift_end in query:
+            booked[worker_id].append((shift_start, shift_end))
+    for occurrence in _overlapping_occurrences(db, worker_ids, span_start, span_end, exclude_id):
+        booked[occurrence.worker_id].append((occurrence.start_time, occurrence.end_time))
+
+    # Stored shifts per worker, sorted by start with a running maximum end,
+    # so one bisect tells whether any of them overlaps an interval
+    stored = {}
+    for worker_id, rows in booked.items():
+        rows.sort()
+        starts = [shift_start for shift_start, _ in rows]
+        max_ends = []
+        for _, shift_end in rows:
+            max_ends.append(max(shift_end, max_ends[-1]) if max_ends else shift_end)
+        stored[worker_id] = (starts, max_ends)
+
+    # Accepted requested intervals per worker, disjoint and sorted by start
+    accepted: Dict[int, Tuple[List[datetime], List[datetime]]] = defaultdict(lambda: ([], []))
+
+    conflicts = set()
+    for position, (worker_id, start, end) in enumerate(intervals):
+        if worker_id in stored:
+            starts, max_ends = stored[worker_id]
+            before_end = bisect_left(starts, end)
+            if before_end and max_ends[before_end - 1] > start:
+                conflicts.add(position)
+                continue
+
+        starts, ends = accepted[worker_id]
+        index = bisect_left(starts, start)
+        if (index and ends[index - 1] > start) or (index < len(starts) and starts[index] < end):
+            conflicts.add(position)
+            continue
+        starts.insert(index, start)
+        ends.insert(index, end)
+
+    return conflicts
+
+
+def _occurrence_counts(frame: pd.DataFrame, until: datetime) -> np.ndarray:
+    """Number of occurrences of each row from its date through ``until``"""
+    first = frame['date'].dt.normalize()
+    last = pd.Timestamp(until).normalize()
+    pattern = frame['recurrence_pattern']
+
+    step = pattern.map(RECURRENCE_STEP_DAYS).fillna(1).to_numpy()
+    counts = (last - first).dt.days.to_numpy() // step + 1
+
+    # Monthly occurrences fall on the same day, clamped to shorter months
+    months = (last.year - first.dt.year) * 12 + (last.month - first.dt.month)
+    last_fits = np.minimum(first.dt.day, last.days_in_month) <= last.day
+    monthly_counts = (months + last_fits.astype(int)).to_numpy()
+
+    counts = np.where(pattern == "monthly", monthly_counts, counts)
+    return np.where(frame['recurring'], np.maximum(counts, 1), 1)
+
+
+def expand_recurrences(frame: pd.DataFrame, until: Optional[datetime]) -> pd.DataFrame:
+    """Expand recurring rows of ``frame`` into one row per occurrence
+
+    ``frame`` needs ``date``, ``start_time``, ``end_time``, ``recurring`` and
+    ``recurrence_pattern`` columns. Each row is repeated through ``until`` and
+    shifted with array arithmetic; the occurrence number is added as
+    ``occurrence``. Without ``until`` every row occurs once.
+    """
+    counts = np.ones(len(frame), dtype=int) if until is None else _occurrence_counts(frame, until)
+    expanded = frame.loc[frame.index.repeat(counts)]
+    occurrence = expanded.groupby(level=0).cumcount().to_numpy()
+    expanded = expanded.reset_index(drop=True).assign(occurrence=occurrence)
+
+    anchor = expanded['date']
+    step = expanded['recurrence_pattern'].map(RECURRENCE_STEP_DAYS).fillna(0).to_numpy()
+    offset = pd.to_timedelta(occurrence * step, unit='D')
+
+    monthly = (expanded['recurrence_pattern'] == "monthly").to_numpy()
+    if monthly.any():
+        months = anchor.to_numpy().astype('datetime64[M]') + occurrence
+        month_start = months.astype('datetime64[D]')
+        days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(int)
+        day = np.minimum(anchor.dt.day.to_numpy(), days_in_month) - 1
+        shifted = pd.to_datetime(month_start + day.astype('timedelta64[D]')) + (anchor - anchor.dt.normalize()).to_numpy()
+        offset = np.where(monthly, shifted - anchor.to_numpy(), offset)
+        offset = pd.to_timedelta(offset)
+
+    return expanded.assign(
+        date=anchor + offset,
+        start_time=expanded['start_time'] + offset,
+        end_time=expanded['end_time'] + offset
+    )
+
+
+def _known_worker_ids(db: Session, worker_ids: Sequence[int]) -> Set[int]:
+    known = set()
+    worker_ids = list(set(worker_ids))
+    for chunk in chunks(worker_ids, LOOKUP_CHUNK_SIZE):
+        known.update(worker_id for worker_id, in db.query(models.Worker.id).filter(models.Worker.id.in_(chunk)))
+    return known
+
+
+def _row_intervals(row: Dict) -> List[Tuple[datetime, datetime]]:
+    """Intervals of a new shift row, every occurrence for templates"""
+    if not (row['is_recurring'] and row['recurrence_pattern']):
+        return [(row['start_time'], row['end_time'])]
+    first = row['date'].date()
+    last = first + timedelta(days=RECURRENCE_CHECK_DAYS)
+    if row['recurrence_end'] is not None:
+        last = min(last, row['recurrence_end'].date())
+    return [
+        (row['start_time'] + offset, row['end_time'] + offset)
+        for offset in (
+            timedelta(days=(day - first).days)
+            for day in occurrence_dates(first, row['recurrence_pattern'], first, last)
+        )
+    ]
+
+
+def schedule_shifts(
+    db: Session,
+    shifts: Sequence[schemas.ShiftCreate],
+    repeat_until: Optional[datetime] = None,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Tuple[int, int, List[str]]:
+    """Create ``shifts``, expanding recurring ones through ``repeat_until``
+
+    Occurrences that are invalid, belong to an unknown worker or overlap an
+    existing shift (or an earlier one in the request) are skipped. Returns the
+    created and skipped counts and the reasons for skipping; everything else
+    is inserted in one transaction. Raises ValueError when the request expands
+    to more than ``BULK_SHIFT_LIMIT`` shifts.
+    """
+    errors = []
+    known_workers = _known_worker_ids(db, [shift.worker_id for shift in shifts])
+
+    templates = []
+    for position, shift in enumerate(shifts):
+        if shift.worker_id not in known_workers:
+            reason = "Worker not found"
+        else:
+            reason = validate_interval(shift.start_time, shift.end_time)
+        if reason:
+            errors.append(f"Shift {position}: {reason}")
+            continue
+        templates.append({
+            'position': position,
+            'worker_id': shift.worker_id,
+            'date': shift.date,
+            'start_time': shift.start_time,
+            'end_time': shift.end_time,
+            'is_recurring': bool(shift.is_recurring),
+            'recurring': bool(shift.is_recurring and shift.recurrence_pattern and repeat_until),
+            'recurrence_pattern': shift.recurrence_pattern.value if shift.recurrence_pattern else None,
+            'status': shift.status.value if shift.status else "scheduled",
+            'notes': shift.notes,
+        })
+
+    if not templates:
+        return 0, len(errors), errors
+
+    frame = pd.DataFrame(templates)
+    for column in ('date', 'start_time', 'end_time'):
+        frame[column] = pd.to_datetime(frame[column])
+
+    if repeat_until is not None and frame['recurring'].any():
+        total = int(_occurrence_counts(frame, repeat_until).sum())
+        if total > BULK_SHIFT_LIMIT:
+            raise ValueError(f"Request expands to {total} shifts, more than the limit of {BULK_SHIFT_LIMIT}")
+
+    occurrences = expand_recurrences(frame, repeat_until)
+
+    rows = []
+    for position, worker_id, shift_date, start_time, end_time, is_recurring, recurring, pattern, shift_status, notes in zip(
+        occurrences['position'], occurrences['worker_id'], occurrences['date'],
+        occurrences['start_time'], occurrences['end_time'], occurrences['is_recurring'],
+        occurrences['recurring'], occurrences['recurrence_pattern'], occurrences['status'], occurrences['notes']
+    ):
+        recurrence_end = shifts[position].recurrence_end
+        shift_date = shift_date.to_pydatetime()
+        if recurring and recurrence_end and shift_date > recurrence_end:
+            continue
+        rows.append((int(position), {
+            'worker_id': int(worker_id),
+            'date': shift_date,
+            'start_time': start_time.to_pydatetime(),
+            'end_time': end_time.to_pydatetime(),
+            # Expanded occurrences are concrete shifts; the pattern records their origin
+            'is_recurring': False if recurring else bool(is_recurring),
+            'recurrence_pattern': pattern,
+            'recurrence_end': None if recurring else recurrence_end,
+            'status': shift_status,
+            'notes': notes,
+        }))
+
+    # Cancelled shifts never conflict; templates are checked occurrence by occurrence
+    checked = [
+        (index, (row['worker_id'], start, end))
+        for index, (_, row) in enumerate(rows) if row['status'] != "cancelled"
+        for start, end in _row_intervals(row)
+    ]
+    conflicts = find_conflicts(db, [interval for _, interval in checked])
+    conflicting = {checked[position][0] for position in conflicts}
+
+    new_shifts = []
+    for index, (position, row) in enumerate(rows):
+        if index in conflicting:
+            errors.append(f"Shift {position} on {row['date']:%Y-%m-%d}: Worker already has an overlapping shift")
+        else:
+            new_shifts.append(row)
+
+    try:
+        bulk_insert(db, models.Shift, new_shifts, batch_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(new_shifts), len(errors), errors
+
+
+def day_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Half-open datetime range covering the days ``start`` through ``end``"""
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+
+def occurrence_dates(first: date, pattern: str, start: date, end: date) -> Iterator[date]:
+    """Yield the days within ``start``..``end`` a recurrence from ``first`` falls on
+
+    Starts at the first occurrence inside the window rather than walking the
+    series from ``first``, so the cost only depends on the window.
+    """
+    start = max(start, first)
+    if pattern in RECURRENCE_STEP_DAYS:
+        step = RECURRENCE_STEP_DAYS[pattern]
+        current = first + timedelta(days=-(-(start - first).days // step) * step)
+        while current <= end:
+            yield current
+            current += timedelta(days=step)
+    elif pattern == "monthly":
+        months = (start.year - first.year) * 12 + start.month - first.month
+        while True:
+            year, month = divmod(first.month - 1 + months, 12)
+            year += first.year
+            current = date(year, month + 1, min(first.day, calendar.monthrange(year, month + 1)[1]))
+            if current > end:
+                return
+            if current >= start:
+                yield current
+            months += 1
+
+
+def shift_key(shift) -> Tuple[datetime, int]:
+    """Listing order of stored shifts and occurrences"""
+    return shift.date, shift.id
+
+
+def load_overrides(
+    db: Session,
+    shift_ids: Sequence[int],
+    start: date,
+    end: date
+) -> Dict[int, Dict[date, models.ShiftOverride]]:
+    """Fetch the overrides of the given templates within ``start``..``end``"""
+    overrides = defaultdict(dict)
+    for chunk in chunks(shift_ids, LOOKUP_CHUNK_SIZE):
+        for override in db.query(models.ShiftOverride).filter(
+            models.ShiftOverride.shift_id.in_(chunk),
+            models.ShiftOverride.occurrence_date >= start,
+            models.ShiftOverride.occurrence_date <= end
+        ):
+            overrides[override.shift_id][override.occurrence_date] = override
+    return overrides
+
+
+def _template_occurrences(
+    template: schemas.Shift,
+    overrides: Dict[date, models.ShiftOverride],
+    start: date,
+    end: date
+) -> Iterator[schemas.Shift]:
+    first = template.date.date()
+    if template.recurrence_end is not None:
+        end = min(end, template.recurrence_end.date())
+
+    pattern = RecurrencePattern(template.recurrence_pattern).value
+    for day in occurrence_dates(first, pattern, start, end):
+        offset = timedelta(days=(day - first).days)
+        update = {
+            "date": template.date + offset,
+            "start_time": template.start_time + offset,
+            "end_time": template.end_time + offset,
+        }
+        override = overrides.get(day)
+        if override is not None:
+            update.update({
+                field: getattr(override, field)
+                for field in OVERRIDE_FIELDS
+                if getattr(override, field) is not None
+            })
+        yield template.model_copy(update=update)
+
+
+def iter_occurrences(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    worker_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    worker_ids: Optional[Sequence[int]] = None
+) -> Iterator[schemas.Shift]:
+    """Yield the occurrences of recurring shifts on the days ``date_from``
+    through ``date_to``, in listing order
+
+    Occurrences carry their template's id. ``after`` is a decoded
+    ``(date, id)`` cursor; only occurrences past it are yielded.
+    ``worker_ids`` limits them to several workers.
+    """
+    if after is not None:
+        date_from = max(date_from, after[0].date())
+    window_start, window_end = day_bounds(date_from, date_to)
+
+    query = db.query(models.Shift).options(joinedload(models.Shift.worker)).filter(
+        TEMPLATE_FILTER,
+        models.Shift.date < window_end,
+        or_(models.Shift.recurrence_end.is_(None), models.Shift.recurrence_end >= window_start)
+    )
+    if worker_id:
+        query = query.filter(models.Shift.worker_id == worker_id)
+    if worker_ids is None:
+        templates = query.order_by(models.Shift.id).all()
+    else:
+        worker_ids = list(worker_ids)
+        templates = []
+        for chunk in chunks(worker_ids, LOOKUP_CHUNK_SIZE):
+            templates.extend(query.filter(models.Shift.worker_id.in_(chunk)))
+        templates.sort(key=lambda template: template.id)
+
+    overrides = load_overrides(db, [template.id for template in templates], date_from, date_to)
+    series = [
+        _template_occurrences(schemas.Shift.model_validate(template), overrides[template.id], date_from, date_to)
+        for template in templates
+    ]
+
+    for occurrence in heapq.merge(*series, key=shift_key):
+        if after is not None and shift_key(occurrence) <= tuple(after):
+            continue
+        if status and occurrence.status != status:
+            continue
+        yield occurrence
+
+
+def merge_shifts(
+    stored: Iterable,
+    occurrences: Iterable[schemas.Shift],
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> List:
+    """Merge stored shifts and occurrences, both in listing order, into one page"""
+    merged = heapq.merge(stored, occurrences, key=shift_key)
+    return list(islice(merged, skip, None if limit is None else skip + limit))
+
+
+def list_window(
+    db: Session,
+    stored_query,
+    date_from: date,
+    date_to: date,
+    worker_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[Sequence] = None,
+    skip: int = 0,
+    limit: int = 100,
+    rows: bool = False
+) -> List:
+    """Return a page of stored shifts and template occurrences within a window
+
+    ``stored_query`` selects the stored, non-template shifts of the window in
+    listing order; at most ``skip + limit`` of them are read. With ``rows``
+    the stored shifts are returned as the selected rows instead of entities.
+    """
+    result = db.execute(stored_query.limit(skip + limit))
+    stored = result.all() if rows else result.scalars().all()
+    occurrences = iter_occurrences(db, date_from, date_to, worker_id, status, after)
+    return merge_shifts(stored, occurrences, skip, limit)
+
+
+def template_intervals(db: Session, shift: models.Shift) -> List[Interval]:
+    """Non-cancelled occurrences of a flushed template through its recurrence
+    end, or ``RECURRENCE_CHECK_DAYS`` days for open-ended ones"""
+    first = shift.date.date()
+    last = first + timedelta(days=RECURRENCE_CHECK_DAYS)
+    if shift.recurrence_end is not None:
+        last = min(last, shift.recurrence_end.date())
+    return [
+        (occurrence.worker_id, occurrence.start_time, occurrence.end_time)
+        for occurrence in iter_occurrences(db, first, last, worker_id=shift.worker_id)
+        if occurrence.id == shift.id and occurrence.status != "cancelled"
+    ]
+
+
+def has_overlap(db: Session, shift: models.Shift) -> bool:
+    """Whether a flushed shift, or any occurrence of a template, overlaps
+    another shift or occurrence of its worker"""
+    if shift.is_recurring and shift.recurrence_pattern:
+        return bool(find_conflicts(db, template_intervals(db, shift), exclude_id=shift.id))
+    return find_overlapping_shift(db, shift.worker_id, shift.start_time, shift.end_time, exclude_id=shift.id) is not None
+
+
+def get_occurrence(db: Session, shift: models.Shift, occurrence_date: date) -> Optional[schemas.Shift]:
+    """Return one occurrence of a recurring shift, or None if it does not fall on that day"""
+    occurrences = iter_occurrences(db, occurrence_date, occurrence_date, worker_id=shift.worker_id)
+    return next((occurrence for occurrence in occurrences if occurrence.id == shift.id), None)
@@ -0,0 +1,105 @@
+"""Per-worker week and month statistics.
+
+All figures for any number of workers come from one statement: time records
+and completed shifts are each grouped by worker with conditional sums for the
+two periods, and joined onto the worker rows.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+
+def period_starts(now: datetime) -> Tuple[datetime, datetime]:
+    """Return the start of the current week (Monday) and month"""
+    today = datetime.combine(now.date(), datetime.min.time())
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    return week_start, month_start
+
+
+def _conditional_sum(condition, value):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+
+def worker_stats_query(worker_ids: Optional[Sequence[int]], now: datetime):
+    """Build the grouped statistics statement for the given workers"""
+    week_start, month_start = period_starts(now)
+    since = min(week_start, month_start)
+
+    record = models.TimeRecord
+    hours = select(
+        record.worker_id,
+        _conditional_sum(record.clock_in >= week_start, record.total_hours).label("hours_week"),
+        _conditional_sum(record.clock_in >= month_start, record.total_hours).label("hours_month"),
+        _conditional_sum(record.clock_in >= week_start, record.overtime_hours).label("overtime_week"),
+        _conditional_sum(record.clock_in >= month_start, record.overtime_hours).label("overtime_month"),
+    ).where(record.clock_in >= since).group_by(record.worker_id)
+
+    shift = models.Shift
+    shifts = select(
+        shift.worker_id,
+        _conditional_sum(shift.date >= week_start, 1).label("shifts_week"),
+        _conditional_sum(shift.date >= month_start, 1).label("shifts_month"),
+    ).where(
+        shift.date >= since,
+        shift.status == "completed"
+    ).group_by(shift.worker_id)
+
+    if worker_ids is not None:
+        hours = hours.where(record.worker_id.in_(worker_ids))
+        shifts = shifts.where(shift.worker_id.in_(worker_ids))
+
+    hours = hours.subquery()
+    shifts = shifts.subquery()
+
+    query = select(
+        models.Worker.id,
+        models.Worker.name,
+        func.coalesce(hours.c.hours_week, 0),
+        func.coalesce(hours.c.hours_month, 0),
+        func.coalesce(hours.c.overtime_week, 0),
+        func.coalesce(hours.c.overtime_month, 0),
+        func.coalesce(shifts.c.shifts_week, 0),
+        func.coalesce(shifts.c.shifts_month, 0),
+    ).outerjoin(
+        hours, hours.c.worker_id == models.Worker.id
+    ).outerjoin(
+        shifts, shifts.c.worker_id == models.Worker.id
+    ).order_by(models.Worker.id)
+
+    if worker_ids is not None:
+        query = query.where(models.Worker.id.in_(worker_ids))
+
+    return query
+
+
+def compute_worker_stats(
+    db: Session,
+    worker_ids: Optional[Sequence[int]] = None,
+    now: Optional[datetime] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> List[schemas.WorkerStats]:
+    """Compute statistics for the given workers, or a page of all workers"""
+    query = worker_stats_query(worker_ids, now or datetime.now())
+    if worker_ids is None:
+        query = query.offset(skip).limit(limit)
+
+    return [
+        schemas.WorkerStats(
+            worker_id=worker_id,
+            worker_name=name,
+            total_hours_week=hours_week,
+            total_hours_month=hours_month,
+            overtime_hours_week=overtime_week,
+            overtime_hours_month=overtime_month,
+            shifts_completed_week=shifts_week,
+            shifts_completed_month=shifts_month
+        )
+        for (worker_id, name, hours_week, hours_month, overtime_week,
+             overtime_month, shifts_week, shifts_month) in db.execute(query)
+    ]
@@ -0,0 +1,113 @@
+"""Throughput of the shift listing and clock-in with sync and async handlers
+
+Starts the API with uvicorn once with DB_ASYNC=false and once with
+DB_ASYNC=true, each on a throwaway SQLite database seeded with workers and a
+shift for each of them today. Concurrent clients then list shifts for a fixed
+time, and clock every worker in, and the requests per second and the
+responses of each phase are reported per mode.
+
+    cd backend
+    python benchmarks/async_handlers_load.py
+    python benchmarks/async_handlers_load.py --mode async --clients 50 --duration 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import httpx
+
+from server import register_workers, running_server, wait_until_up
+
+MODES = {"sync": "false", "async": "true"}
+
+
+async def _seed_shifts(client: httpx.AsyncClient, worker_ids: List[int]):
+    start = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=9)
+    for worker_id in worker_ids:
+        response = await client.post("/api/shifts/", json={
+            "worker_id": worker_id,
+            "date": start.isoformat(),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=8)).isoformat()
+        })
+        response.raise_for_status()
+
+
+async def _outcome(request) -> str:
+    try:
+        return str((await request).status_code)
+    except httpx.HTTPError as e:
+        return type(e).__name__
+
+
+async def _list_shifts(client: httpx.AsyncClient, clients: int, duration: float) -> Counter:
+    """Have ``clients`` clients list shifts back to back for ``duration`` seconds"""
+    deadline = time.monotonic() + duration
+    outcomes = Counter()
+
+    async def list_until_deadline():
+        while time.monotonic() < deadline:
+            outcomes[await _outcome(client.get("/api/shifts/", params={"limit": 100}))] += 1
+
+    await asyncio.gather(*[list_until_deadline() for _ in range(clients)])
+    return outcomes
+
+
+async def _clock_in(client: httpx.AsyncClient, clients: int, worker_ids: List[int]) -> Counter:
+    """Clock every worker in, with ``clients`` requests in flight at a time"""
+    pending = iter(worker_ids)
+    outcomes = Counter()
+
+    async def clock_in_next():
+        for worker_id in pending:
+            outcomes[await _outcome(client.post("/api/tracking/clock-in", json={"worker_id": worker_id}))] += 1
+
+    await asyncio.gather(*[clock_in_next() for _ in range(clients)])
+    return outcomes
+
+
+def _report(mode: str, phase: str, outcomes: Counter, elapsed: float):
+    print(
+        f"{mode:>5} {phase:<13} {sum(outcomes.values()) / elapsed:7.1f} req/s "
+        f"over {elapsed:.1f}s, responses {dict(outcomes)}"
+    )
+
+
+async def run(args: argparse.Namespace, mode: str, base_url: str, server) -> Dict[str, Counter]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await wait_until_up(client, server)
+        worker_ids = await register_workers(client, args.workers)
+        await _seed_shifts(client, worker_ids)
+
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        listed = await _list_shifts(client, args.clients, args.duration)
+        _report(mode, "shift listing", listed, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        clocked_in = await _clock_in(client, args.clients, worker_ids)
+        _report(mode, "clock-in", clocked_in, time.perf_counter() - start)
+    return {"shift listing": listed, "clock-in": clocked_in}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["both", *MODES], default="both", help="Handlers to measure")
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--workers", type=int, default=500, help="Workers to seed and clock in")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to list shifts for")
+    args = parser.parse_args()
+
+    for mode in MODES if args.mode == "both" else [args.mode]:
+        with running_server(DB_ASYNC=MODES[mode]) as (base_url, server):
+            asyncio.run(run(args, mode, base_url, server))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
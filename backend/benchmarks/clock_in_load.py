@@ -0,0 +1,81 @@
+"""Load test for a shift-change burst of concurrent clock-ins
+
+Starts the API with uvicorn on a throwaway SQLite database, registers the
+workers, then has all of them clock in at once and reports the latency
+percentiles. Exits non-zero when any clock-in fails, or when p99 exceeds
+``--max-p99-ms`` if given; latency depends on the machine, so there is no
+default budget.
+
+    cd backend
+    python benchmarks/clock_in_load.py
+    python benchmarks/clock_in_load.py --clock-in-batch-ms 5 --db-async --max-p99-ms 1000
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import List, Tuple
+
+import httpx
+
+from server import register_workers, running_server, wait_until_up
+
+
+async def _clock_in(client: httpx.AsyncClient, worker_id: int) -> Tuple[str, float]:
+    start = time.perf_counter()
+    try:
+        outcome = str((await client.post("/api/tracking/clock-in", json={"worker_id": worker_id})).status_code)
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - start
+
+
+def _percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+
+async def run(args: argparse.Namespace, base_url: str, server: subprocess.Popen) -> bool:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await wait_until_up(client, server)
+        worker_ids = await register_workers(client, args.workers)
+
+    limits = httpx.Limits(max_connections=args.workers)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[_clock_in(client, worker_id) for worker_id in worker_ids])
+        elapsed = time.perf_counter() - start
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = sorted(latency for _, latency in results)
+    p99 = _percentile(latencies, 0.99)
+    print(
+        f"{len(results)} concurrent clock-ins in {elapsed:.2f}s: "
+        f"p50 {_percentile(latencies, 0.50):.0f}ms, "
+        f"p95 {_percentile(latencies, 0.95):.0f}ms, "
+        f"p99 {p99:.0f}ms, "
+        f"max {latencies[-1] * 1000:.0f}ms, "
+        f"responses {dict(outcomes)}"
+    )
+    return outcomes == Counter({"201": len(results)}) and (args.max_p99_ms is None or p99 <= args.max_p99_ms)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=500, help="Workers clocking in at once")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail when p99 latency is above this")
+    parser.add_argument("--clock-in-batch-ms", type=int, default=0, help="CLOCK_IN_BATCH_MS for the server")
+    parser.add_argument("--db-async", action="store_true", help="Run the server with DB_ASYNC=true")
+    args = parser.parse_args()
+
+    with running_server(
+        DB_ASYNC="true" if args.db_async else "false",
+        CLOCK_IN_BATCH_MS=str(args.clock_in_batch_ms)
+    ) as (base_url, server):
+        passed = asyncio.run(run(args, base_url, server))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Time of importing a generated workers CSV through /upload-csv
+
+Starts the API with uvicorn on a throwaway SQLite database and uploads a CSV
+of new workers, then the same file again, when every email is already
+registered. Reports the time and rows per second of each upload, and exits
+non-zero when an upload fails or does not import every row.
+
+    cd backend
+    python benchmarks/csv_import.py
+    python benchmarks/csv_import.py --rows 20000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import subprocess
+import sys
+import time
+
+import httpx
+
+from server import running_server, wait_until_up
+
+POSITIONS = ["Cook", "Server", "Cashier", "Cleaner"]
+
+
+def build_csv(rows: int) -> str:
+    """A workers CSV in the upload format with ``rows`` distinct emails"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["Worker Name", "Worker Email", "Position", "Hourly Rate"])
+    for number in range(rows):
+        writer.writerow([
+            f"Import Worker {number}",
+            f"import{number}@example.com",
+            POSITIONS[number % len(POSITIONS)],
+            f"{15 + number % 20}.50"
+        ])
+    return out.getvalue()
+
+
+async def _upload(client: httpx.AsyncClient, contents: str, rows: int, label: str) -> bool:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/google-sheets/upload-csv",
+        files={"file": ("workers.csv", contents, "text/csv")}
+    )
+    elapsed = time.perf_counter() - start
+    imported = response.json().get("imported_count") if response.status_code == 200 else None
+    print(
+        f"{label:<18} {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s), "
+        f"status {response.status_code}, imported {imported}"
+    )
+    return imported == rows
+
+
+async def run(args: argparse.Namespace, base_url: str, server: subprocess.Popen) -> bool:
+    contents = build_csv(args.rows)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        await wait_until_up(client, server)
+        inserted = await _upload(client, contents, args.rows, "new workers")
+        resolved = await _upload(client, contents, args.rows, "existing workers")
+    return inserted and resolved
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows in the generated CSV")
+    args = parser.parse_args()
+
+    with running_server() as (base_url, server):
+        passed = asyncio.run(run(args, base_url, server))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Response times of the shift and time record listings with and without fast=true
+
+Seeds a throwaway SQLite database with workers, shifts this month and a
+completed time record for every shift, starts the API on it with uvicorn,
+and requests each listing with the default ORM path and with ``fast=true``.
+Reports the best of ``--repeat`` response times of both, and exits non-zero
+when the two paths return different JSON or next-page cursors.
+
+    cd backend
+    python benchmarks/fast_listings.py
+    python benchmarks/fast_listings.py --db-async --workers 200
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Tuple
+
+import httpx
+
+from server import running_server, wait_until_up
+
+SHIFTS_PER_WORKER = 6
+MONTH_START = date.today().replace(day=1)
+NEXT_MONTH = (MONTH_START + timedelta(days=32)).replace(day=1)
+
+LISTINGS = [
+    ("/api/shifts/", {}),
+    ("/api/shifts/", {"date_from": MONTH_START.isoformat(), "date_to": NEXT_MONTH.isoformat()}),
+    ("/api/tracking/records", {}),
+    ("/api/tracking/records", {"expand": "worker"}),
+    ("/api/tracking/records", {"expand": "worker,shift"}),
+]
+
+
+def _timestamp(value: datetime) -> str:
+    # As SQLAlchemy stores DateTime columns in SQLite
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+def seed(database: str, workers: int):
+    """Insert workers with shifts this month, each worked as scheduled"""
+    with sqlite3.connect(database) as connection:
+        connection.executemany(
+            "INSERT INTO workers (id, name, email, position, hourly_rate, is_active) VALUES (?, ?, ?, ?, ?, 1)",
+            [(number, f"Worker {number}", f"worker{number}@example.com", "Server", 20.0)
+             for number in range(1, workers + 1)]
+        )
+        shifts, records = [], []
+        for worker_id in range(1, workers + 1):
+            for number in range(SHIFTS_PER_WORKER):
+                day = MONTH_START + timedelta(days=(worker_id + number * 4) % 28)
+                start = datetime.combine(day, datetime.min.time()) + timedelta(hours=9)
+                end = start + timedelta(hours=8)
+                shift_id = len(shifts) + 1
+                shifts.append((shift_id, worker_id, _timestamp(start), _timestamp(start), _timestamp(end)))
+                records.append((worker_id, shift_id, _timestamp(start), _timestamp(end)))
+        connection.executemany(
+            "INSERT INTO shifts (id, worker_id, date, start_time, end_time, is_recurring, status) "
+            "VALUES (?, ?, ?, ?, ?, 0, 'scheduled')",
+            shifts
+        )
+        connection.executemany(
+            "INSERT INTO time_records (worker_id, shift_id, clock_in, clock_out, total_hours, overtime_hours, status) "
+            "VALUES (?, ?, ?, ?, 8.0, 0.0, 'completed')",
+            records
+        )
+
+
+async def _best_time(client: httpx.AsyncClient, url: str, params: Dict, repeat: int) -> Tuple[float, httpx.Response]:
+    best, response = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(url, params=params)
+        best = min(best, time.perf_counter() - start)
+        response.raise_for_status()
+    return best, response
+
+
+async def run(args: argparse.Namespace, base_url: str, server: subprocess.Popen, database: str) -> bool:
+    identical = True
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        await wait_until_up(client, server)
+        seed(database, args.workers)
+
+        for url, params in LISTINGS:
+            params = {"limit": args.limit, **params}
+            default_time, default = await _best_time(client, url, params, args.repeat)
+            fast_time, fast = await _best_time(client, url, {**params, "fast": "true"}, args.repeat)
+            same = (
+                default.json() == fast.json()
+                and default.headers.get("X-Next-Cursor") == fast.headers.get("X-Next-Cursor")
+            )
+            identical = identical and same
+            listing = url + "?" + "&".join(f"{name}={value}" for name, value in params.items())
+            print(
+                f"{listing:<68} {default_time * 1000:6.0f}ms -> {fast_time * 1000:5.0f}ms"
+                f"{'' if same else '  RESPONSES DIFFER'}"
+            )
+    return identical
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1000, help=f"Workers, with {SHIFTS_PER_WORKER} shifts each")
+    parser.add_argument("--limit", type=int, default=5000, help="Page size requested")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per listing, the fastest is reported")
+    parser.add_argument("--db-async", action="store_true", help="Run the server with DB_ASYNC=true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as database_dir:
+        database = os.path.join(database_dir, "listings.db")
+        with running_server(
+            DATABASE_URL=f"sqlite:///{database}",
+            DB_ASYNC="true" if args.db_async else "false"
+        ) as (base_url, server):
+            passed = asyncio.run(run(args, base_url, server, database))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
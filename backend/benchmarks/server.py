@@ -0,0 +1,69 @@
+"""A throwaway API server and seeding helpers shared by the load benchmarks"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(**env: str) -> Iterator[Tuple[str, subprocess.Popen]]:
+    """Run uvicorn with ``env`` set, on an empty SQLite database unless it sets
+    DATABASE_URL, yielding the server's URL and process"""
+    port = free_port()
+    with tempfile.TemporaryDirectory() as database_dir:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env={
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(database_dir, 'load.db')}",
+                "JOB_WORKERS": "0",
+                **env
+            }
+        )
+        try:
+            yield f"http://127.0.0.1:{port}", server
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def wait_until_up(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def register_workers(client: httpx.AsyncClient, count: int) -> List[int]:
+    worker_ids = []
+    for number in range(count):
+        response = await client.post("/api/workers/", json={
+            "name": f"Load Worker {number}",
+            "email": f"load{number}@example.com"
+        })
+        response.raise_for_status()
+        worker_ids.append(response.json()["id"])
+    return worker_ids
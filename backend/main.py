@@ -3,12 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
-from app.routers import workers, shifts, tracking, google_sheets
-from app.database import engine, Base
+from anyio import to_thread
+
+from app.routers import workers, shifts, tracking, reports, google_sheets, jobs
+from app.database import engine, Base, SessionLocal, DB_ASYNC, THREADPOOL_SIZE
+from app.cache import response_cache
+from app.services.rollup_service import ensure_rollups
+from app.services.presence_service import presence_index
+from app.services.job_service import job_queue
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Build dashboard rollups for databases created before they existed, and
+# warm the clocked-in presence index
+with SessionLocal() as db:
+    ensure_rollups(db)
+    presence_index.ensure(db)
+
 app = FastAPI(
     title="Work Shifts Tracker",
     description="A comprehensive work shifts tracking system",
@@ -22,13 +34,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition"],
 )
 
+@app.on_event("startup")
+async def configure_threadpool():
+    # Sync handlers each hold one of these threads for the whole request
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+@app.on_event("startup")
+def start_job_workers():
+    # Queues jobs whose process crashed again before the workers take any
+    job_queue.start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_queue.stop()
+
+# Async handlers take precedence over the sync ones for the same paths
+if DB_ASYNC:
+    from app.routers import async_api
+
+    app.include_router(async_api.workers_router, prefix="/api/workers", tags=["workers"])
+    app.include_router(async_api.shifts_router, prefix="/api/shifts", tags=["shifts"])
+    app.include_router(async_api.tracking_router, prefix="/api/tracking", tags=["tracking"])
+
 # Include routers
 app.include_router(workers.router, prefix="/api/workers", tags=["workers"])
 app.include_router(shifts.router, prefix="/api/shifts", tags=["shifts"])
 app.include_router(tracking.router, prefix="/api/tracking", tags=["tracking"])
+app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 app.include_router(google_sheets.router, prefix="/api/google-sheets", tags=["google-sheets"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -38,6 +75,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Response cache hit and miss counters"""
+    return response_cache.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
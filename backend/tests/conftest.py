@@ -0,0 +1,38 @@
+"""Fixtures running the app against a throwaway SQLite database"""
+import os
+import tempfile
+
+import pytest
+
+# The engine is built when app.database is imported, so these come first
+_database_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir.name, 'test.db')}"
+os.environ["JOB_WORKERS"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.cache import response_cache  # noqa: E402
+from app.database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def statements():
+    """The SQL statements run while the test runs, as ``(statement, parameters)``"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    # Cached responses would skip the queries under test
+    response_cache.clear()
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,104 @@
+"""A local stand-in for the Google Sheets API and its OAuth token endpoint
+
+Point the app at it with ``GOOGLE_SHEETS_API_ENDPOINT`` and the service
+account from ``credentials_json()``, whose token URI is the fake too.
+"""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+class FakeSheets:
+    """Records every request; the next ``failures`` API requests get a 503"""
+
+    def __init__(self):
+        self.failures = 0
+        # Rows returned when a range is read
+        self.rows: List[List[Any]] = []
+        # Rows written, by range
+        self.values: Dict[str, List[List[Any]]] = {}
+        # (method, path, status) of every API request
+        self.requests: List[Tuple[str, str, int]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeSheets":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def credentials_json(self) -> str:
+        """A service account whose tokens are issued by this server"""
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return json.dumps({
+            "type": "service_account",
+            "project_id": "fake",
+            "private_key_id": "fake",
+            "private_key": key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            ).decode(),
+            "client_email": "tests@fake.iam.gserviceaccount.com",
+            "client_id": "fake",
+            "token_uri": f"{self.url}token",
+        })
+
+    def respond(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if path.startswith("/token"):
+            return 200, {"access_token": "fake", "expires_in": 3600, "token_type": "Bearer"}
+
+        if self.failures > 0:
+            self.failures -= 1
+            status, response = 503, {"error": {"code": 503, "message": "The service is currently unavailable."}}
+        elif method == "POST" and re.match(r"^/v4/spreadsheets(\?|$)", path):
+            status, response = 200, {"spreadsheetId": "fake-spreadsheet"}
+        elif "/values:batchUpdate" in path:
+            for data in body.get("data", []):
+                self.values[data["range"]] = data["values"]
+            status, response = 200, {}
+        elif ":batchUpdate" in path or ":clear" in path:
+            status, response = 200, {}
+        elif method == "GET" and "/values/" in path:
+            status, response = 200, {"values": self.rows}
+        else:
+            status, response = 404, {"error": {"code": 404, "message": "Not found"}}
+        self.requests.append((method, path, status))
+        return status, response
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+                # Token requests are form encoded, API requests JSON
+                is_json = raw and self.headers.get("Content-Type", "").startswith("application/json")
+                status, response = fake.respond(self.command, self.path, json.loads(raw) if is_json else {})
+                payload = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = _handle
+
+        return Handler
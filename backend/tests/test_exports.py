@@ -0,0 +1,71 @@
+"""Bulk exports in every format, read back with the library that writes them"""
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import load_workbook
+
+from app.services.export_service import EXPORT_HEADERS
+
+
+@pytest.fixture(scope="module")
+def exported_worker(client):
+    response = client.post("/api/workers/", json={
+        "name": "Export Worker",
+        "email": "export@example.com",
+        "position": "Driver",
+        "hourly_rate": 21.5
+    })
+    assert response.status_code == 201, response.text
+    worker_id = response.json()["id"]
+    for _ in range(2):
+        response = client.post("/api/tracking/clock-in", json={"worker_id": worker_id})
+        assert response.status_code == 201, response.text
+        response = client.put(f"/api/tracking/clock-out/{response.json()['id']}")
+        assert response.status_code == 200, response.text
+    return worker_id
+
+
+def export(client, worker_id, format):
+    response = client.get("/api/google-sheets/export-csv", params={"worker_id": worker_id, "format": format})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"].startswith('attachment; filename="shifts_export_')
+    return response
+
+
+def test_csv_stream(client, exported_worker):
+    response = client.get("/api/google-sheets/export-csv", params={"worker_id": exported_worker, "stream": True})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = response.text.splitlines()
+    assert header.split(",") == EXPORT_HEADERS
+    assert len(rows) == 2
+    assert all(row.startswith("Export Worker,export@example.com,Driver,21.5,") for row in rows)
+
+
+@pytest.mark.parametrize("format, read", [
+    ("parquet", lambda body: pq.read_table(io.BytesIO(body))),
+    ("arrow", lambda body: pa.ipc.open_stream(body).read_all()),
+])
+def test_arrow_formats_keep_column_types(client, exported_worker, format, read):
+    table = read(export(client, exported_worker, format).content)
+
+    assert table.column_names == EXPORT_HEADERS
+    assert table.num_rows == 2
+    assert table.schema.field("Clock In").type == pa.timestamp("us")
+    assert table.column("Hourly Rate").to_pylist() == [21.5, 21.5]
+    assert table.column("Status").to_pylist() == ["completed", "completed"]
+
+
+def test_xlsx(client, exported_worker):
+    workbook = load_workbook(io.BytesIO(export(client, exported_worker, "xlsx").content), read_only=True)
+
+    header, *rows = workbook["Time Records"].iter_rows(values_only=True)
+    assert list(header) == EXPORT_HEADERS
+    assert [row[:4] for row in rows] == [("Export Worker", "export@example.com", "Driver", 21.5)] * 2
+
+
+def test_cors_exposes_the_attachment_filename(client):
+    response = client.get("/health", headers={"Origin": "http://localhost:3000"})
+    assert "Content-Disposition" in response.headers["access-control-expose-headers"]
@@ -0,0 +1,98 @@
+"""Google Sheets export and import against a local fake of the API"""
+import googleapiclient.http
+import pytest
+
+from app.services import google_sheets_service
+from tests.fake_sheets import FakeSheets
+
+
+@pytest.fixture
+def fake_sheets(monkeypatch):
+    fake = FakeSheets().start()
+    monkeypatch.setenv("GOOGLE_CREDENTIALS_JSON", fake.credentials_json())
+    monkeypatch.delenv("GOOGLE_CREDENTIALS_PATH", raising=False)
+    monkeypatch.setattr(google_sheets_service, "SHEETS_API_ENDPOINT", fake.url)
+    google_sheets_service.invalidate_google_sheets_service()
+    yield fake
+    google_sheets_service.invalidate_google_sheets_service()
+    fake.stop()
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """The retry delays googleapiclient waited, without waiting them"""
+    delays = []
+    monkeypatch.setattr(googleapiclient.http.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture(scope="module")
+def completed_record(client):
+    response = client.post("/api/workers/", json={"name": "Sheets Worker", "email": "sheets@example.com"})
+    assert response.status_code == 201, response.text
+    response = client.post("/api/tracking/clock-in", json={"worker_id": response.json()["id"]})
+    assert response.status_code == 201, response.text
+    response = client.put(f"/api/tracking/clock-out/{response.json()['id']}")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_export_retries_unavailable_responses(client, completed_record, fake_sheets, backoffs):
+    fake_sheets.failures = 2
+
+    response = client.post("/api/google-sheets/export", json={
+        "worker_ids": [completed_record["worker_id"]],
+        "sheet_name": "Export"
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["records_exported"] == 1
+    assert [status for _, _, status in fake_sheets.requests[:3]] == [503, 503, 200]
+    assert len(backoffs) == 2
+    (rows,) = fake_sheets.values.values()
+    assert rows[0][0] == "Worker Name"
+    assert rows[1][:2] == ["Sheets Worker", "sheets@example.com"]
+
+
+def test_import_retries_unavailable_responses(client, completed_record, fake_sheets, backoffs):
+    fake_sheets.failures = 2
+    fake_sheets.rows = [
+        ["Worker Name", "Worker Email", "Clock In", "Clock Out"],
+        ["Sheets Worker", "sheets@example.com", "2026-01-05 08:00:00", "2026-01-05 16:00:00"],
+    ]
+
+    response = client.post("/api/google-sheets/import", json={"spreadsheet_id": "fake-spreadsheet"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["imported_count"] == 1
+    assert [status for _, _, status in fake_sheets.requests] == [503, 503, 200]
+    assert len(backoffs) == 2
+
+
+def test_export_fails_once_retries_run_out(client, completed_record, fake_sheets, backoffs):
+    fake_sheets.failures = google_sheets_service.SHEETS_MAX_RETRIES + 1
+
+    response = client.post("/api/google-sheets/export", json={"sheet_name": "Export"})
+
+    assert response.status_code == 500
+    assert len(backoffs) == google_sheets_service.SHEETS_MAX_RETRIES
+
+
+def test_csv_export(client, completed_record):
+    response = client.get("/api/google-sheets/export-csv", params={"worker_id": completed_record["worker_id"]})
+
+    assert response.status_code == 200, response.text
+    header, *rows = response.json()["csv_data"].splitlines()
+    assert header.startswith("Worker Name,Worker Email")
+    assert rows
+    assert all(row.startswith("Sheets Worker,sheets@example.com") for row in rows)
+
+
+def test_csv_upload(client):
+    csv = "Worker Name,Worker Email,Hourly Rate\nUploaded Worker,uploaded@example.com,18\n,,\n"
+
+    response = client.post("/api/google-sheets/upload-csv", files={"file": ("workers.csv", csv, "text/csv")})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["imported_count"] == 1
+    assert response.json()["errors"] == ["Missing worker email in row 2"]
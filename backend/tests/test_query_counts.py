@@ -0,0 +1,79 @@
+"""Time record endpoints run a fixed number of queries however many records they return"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+WORKERS = 3
+SHIFT_START = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=6)
+
+
+@pytest.fixture(scope="module")
+def clocked_in(client):
+    """Workers clocked in against their shift for today"""
+    worker_ids = []
+    for number in range(WORKERS):
+        response = client.post("/api/workers/", json={
+            "name": f"Count Worker {number}",
+            "email": f"count{number}@example.com",
+            "position": "Server"
+        })
+        assert response.status_code == 201, response.text
+        worker_id = response.json()["id"]
+        worker_ids.append(worker_id)
+
+        response = client.post("/api/shifts/", json={
+            "worker_id": worker_id,
+            "date": SHIFT_START.isoformat(),
+            "start_time": SHIFT_START.isoformat(),
+            "end_time": (SHIFT_START + timedelta(hours=8)).isoformat()
+        })
+        assert response.status_code == 201, response.text
+
+        response = client.post("/api/tracking/clock-in", json={
+            "worker_id": worker_id,
+            "shift_id": response.json()["id"]
+        })
+        assert response.status_code == 201, response.text
+    return worker_ids
+
+
+# Endpoint, query parameters, and the queries it takes: one for the records and
+# one per relation loaded for all of them, the shift's worker included
+QUERY_COUNTS = [
+    ("/api/tracking/active", {}, 1),
+    ("/api/tracking/active", {"expand": "worker"}, 2),
+    ("/api/tracking/active", {"expand": "shift"}, 3),
+    ("/api/tracking/active", {"expand": "worker,shift"}, 4),
+    ("/api/tracking/records", {}, 1),
+    ("/api/tracking/records", {"expand": "worker"}, 2),
+    ("/api/tracking/records", {"expand": "shift"}, 3),
+    ("/api/tracking/records", {"expand": "worker,shift"}, 4),
+    ("/api/tracking/records", {"worker_id": "{worker_id}", "expand": "worker,shift"}, 4),
+    ("/api/tracking/records", {"fast": "true"}, 1),
+    ("/api/tracking/records", {"fast": "true", "expand": "worker,shift"}, 1),
+    ("/api/tracking/worker/{worker_id}/active", {}, 1),
+    ("/api/tracking/worker/{worker_id}/active", {"expand": "worker"}, 2),
+    ("/api/tracking/worker/{worker_id}/active", {"expand": "shift"}, 3),
+    ("/api/tracking/worker/{worker_id}/active", {"expand": "worker,shift"}, 4),
+]
+
+
+@pytest.mark.parametrize("url, params, queries", QUERY_COUNTS)
+def test_query_count(client, clocked_in, statements, url, params, queries):
+    worker_id = clocked_in[0]
+    params = {name: value.format(worker_id=worker_id) for name, value in params.items()}
+    url = url.format(worker_id=worker_id)
+    # Counted once the presence index is loaded, which other tests' writes may have reset
+    client.get(url, params=params)
+    statements.clear()
+
+    response = client.get(url, params=params)
+    assert response.status_code == 200, response.text
+
+    expand = params.get("expand", "")
+    records = response.json()
+    assert records
+    for record in records if isinstance(records, list) else [records]:
+        assert (record.get("worker") is not None) == ("worker" in expand)
+        assert (record.get("shift") is not None) == ("shift" in expand and record["shift_id"] is not None)
+    assert len(statements) == queries, "\n".join(statement for statement, _ in statements)
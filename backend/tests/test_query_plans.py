@@ -0,0 +1,100 @@
+"""Every filter the routers accept is served by an index rather than a table scan"""
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.database import engine
+
+TODAY = date.today()
+MONTH_START = TODAY.replace(day=1).isoformat()
+NEXT_MONTH = (TODAY.replace(day=1) + timedelta(days=32)).replace(day=1).isoformat()
+TODAY_START = datetime.combine(TODAY, datetime.min.time())
+
+# Endpoint, and the tables whose rows its filters must find through an index
+FILTERS = [
+    ("/api/workers/?limit=1&cursor={cursor}", ["workers"]),
+    ("/api/shifts/?limit=1&cursor={shift_cursor}", ["shifts"]),
+    ("/api/shifts/?limit=1&cursor={shift_cursor}&fast=true", ["shifts"]),
+    ("/api/tracking/records?limit=1&cursor={record_cursor}", ["time_records"]),
+    ("/api/tracking/records?limit=1&cursor={record_cursor}&fast=true", ["time_records"]),
+    ("/api/workers/{worker_id}/stats", ["time_records", "shifts"]),
+    ("/api/workers/stats?ids={worker_id}", ["time_records", "shifts"]),
+    ("/api/shifts/?worker_id={worker_id}", ["shifts"]),
+    ("/api/shifts/?worker_id={worker_id}&fast=true", ["shifts"]),
+    (f"/api/shifts/?date_from={MONTH_START}&date_to={NEXT_MONTH}", ["shifts"]),
+    (f"/api/shifts/?worker_id={{worker_id}}&date_from={MONTH_START}&date_to={NEXT_MONTH}&status=scheduled", ["shifts"]),
+    ("/api/shifts/today/", ["shifts"]),
+    ("/api/shifts/worker/{worker_id}/upcoming", ["shifts"]),
+    ("/api/tracking/active", ["time_records"]),
+    ("/api/tracking/worker/{worker_id}/active", ["time_records"]),
+    ("/api/tracking/records?worker_id={worker_id}", ["time_records"]),
+    ("/api/tracking/records?worker_id={worker_id}&fast=true", ["time_records"]),
+    ("/api/tracking/dashboard", ["shifts"]),
+    (f"/api/reports/payroll?period_start={MONTH_START}", ["time_records"]),
+    (f"/api/reports/payroll?period_start={MONTH_START}&worker_id={{worker_id}}", ["time_records"]),
+    (f"/api/reports/summary?date_from={MONTH_START}", ["hours_summaries"]),
+    (f"/api/reports/summary?date_from={MONTH_START}&position=Cook", ["hours_summaries"]),
+    (f"/api/google-sheets/export-csv?date_from={MONTH_START}", ["time_records"]),
+    ("/api/google-sheets/export-csv?worker_id={worker_id}", ["time_records"]),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(client):
+    """Two workers, one clocked in, with a one-off and a recurring shift"""
+    worker_ids = []
+    for number in range(2):
+        response = client.post("/api/workers/", json={
+            "name": f"Plan Worker {number}",
+            "email": f"plan{number}@example.com",
+            "position": "Cook",
+            "hourly_rate": 20
+        })
+        assert response.status_code == 201, response.text
+        worker_ids.append(response.json()["id"])
+
+    for days, recurrence in ((0, None), (1, "weekly")):
+        start = TODAY_START + timedelta(days=days, hours=9)
+        response = client.post("/api/shifts/", json={
+            "worker_id": worker_ids[days],
+            "date": start.isoformat(),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=8)).isoformat(),
+            "is_recurring": recurrence is not None,
+            "recurrence_pattern": recurrence
+        })
+        assert response.status_code == 201, response.text
+
+    response = client.post("/api/tracking/clock-in", json={"worker_id": worker_ids[0]})
+    assert response.status_code == 201, response.text
+
+    return {
+        "worker_id": worker_ids[0],
+        "cursor": client.get("/api/workers/?limit=1").headers["X-Next-Cursor"],
+        "shift_cursor": client.get("/api/shifts/?limit=1").headers["X-Next-Cursor"],
+        "record_cursor": client.get("/api/tracking/records?limit=1").headers["X-Next-Cursor"],
+    }
+
+
+def plan(statement, parameters):
+    with engine.connect() as connection:
+        return [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+@pytest.mark.parametrize("url, tables", FILTERS)
+def test_filters_use_an_index(client, seeded, statements, url, tables):
+    response = client.get(url.format(**seeded))
+    assert response.status_code == 200, response.text
+
+    steps = [
+        step
+        for statement, parameters in statements
+        if statement.lstrip().upper().startswith("SELECT")
+        for step in plan(statement, parameters)
+    ]
+    for table in tables:
+        reads = [step for step in steps if re.match(rf"(SCAN|SEARCH) {table}\b", step)]
+        assert reads, f"{url} did not read {table}"
+        for step in reads:
+            assert step.startswith("SEARCH"), f"{url} scans {table}: {step}"
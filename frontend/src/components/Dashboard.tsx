@@ -1,11 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { 
   UsersIcon, 
   ClockIcon, 
   CalendarDaysIcon,
   ChartBarIcon 
 } from '@heroicons/react/24/outline';
-import { api } from '../services/api';
+import { api, trackingApi } from '../services/api';
 
 interface DashboardStats {
   total_workers: number;
@@ -45,20 +45,59 @@ export default function Dashboard() {
   });
   const [activeRecords, setActiveRecords] = useState<TimeRecord[]>([]);
   const [loading, setLoading] = useState(true);
+  // Ids of the listed active records, so replayed events are applied once
+  const activeIds = useRef<Set<number>>(new Set());
 
   useEffect(() => {
     fetchDashboardData();
+
+    // Apply clock events as they happen instead of polling
+    const events = trackingApi.streamEvents();
+
+    // The event carries the record and its worker, so no fetch is needed
+    events.addEventListener('clock_in', (event) => {
+      const { record }: { record: TimeRecord } = JSON.parse((event as MessageEvent).data);
+      if (activeIds.current.has(record.id)) {
+        return;
+      }
+      activeIds.current.add(record.id);
+      setActiveRecords((records) => [record, ...records]);
+      setStats((s) => ({ ...s, workers_clocked_in: s.workers_clocked_in + 1 }));
+    });
+
+    events.addEventListener('clock_out', (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      if (!activeIds.current.delete(data.record_id)) {
+        return;
+      }
+      const clockedInToday = new Date(data.clock_in).toDateString() === new Date().toDateString();
+      setActiveRecords((records) => records.filter((r) => r.id !== data.record_id));
+      setStats((s) => ({
+        ...s,
+        workers_clocked_in: Math.max(s.workers_clocked_in - 1, 0),
+        total_hours_today: s.total_hours_today + (clockedInToday ? data.total_hours || 0 : 0),
+        overtime_hours_today: s.overtime_hours_today + (clockedInToday ? data.overtime_hours || 0 : 0),
+      }));
+    });
+
+    // Events were missed, reload everything
+    events.addEventListener('resync', () => {
+      fetchDashboardData();
+    });
+
+    return () => events.close();
   }, []);
 
   const fetchDashboardData = async () => {
     try {
       const [statsResponse, activeRecordsResponse] = await Promise.all([
         api.get('/tracking/dashboard'),
-        api.get('/tracking/active')
+        api.get('/tracking/active', { params: { expand: 'worker' } })
       ]);
       
       setStats(statsResponse.data);
       setActiveRecords(activeRecordsResponse.data);
+      activeIds.current = new Set(activeRecordsResponse.data.map((r: TimeRecord) => r.id));
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
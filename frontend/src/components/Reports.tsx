@@ -1,6 +1,14 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { DocumentArrowDownIcon, DocumentArrowUpIcon } from '@heroicons/react/24/outline';
-import { googleSheetsApi } from '../services/api';
+import { googleSheetsApi, jobsApi, reportsApi } from '../services/api';
+
+interface HoursSummaryRow {
+  period_start: string;
+  position: string | null;
+  record_count: number;
+  total_hours: number;
+  overtime_hours: number;
+}
 
 export default function Reports() {
   const [loading, setLoading] = useState(false);
@@ -8,12 +16,24 @@ export default function Reports() {
     spreadsheet_id: '',
     sheet_name: 'Shifts Data',
   });
+  const [exportFormat, setExportFormat] = useState('csv');
+  const [summaryPeriod, setSummaryPeriod] = useState('week');
+  const [summary, setSummary] = useState<HoursSummaryRow[]>([]);
+
+  useEffect(() => {
+    reportsApi
+      .getSummary({ period: summaryPeriod, group_by: 'position' })
+      .then((response) => setSummary(response.data))
+      .catch((error) => console.error('Error fetching hours summary:', error));
+  }, [summaryPeriod]);
 
   const handleExportToSheets = async () => {
     setLoading(true);
     try {
-      const response = await googleSheetsApi.export(exportData);
-      alert(`Data exported successfully! ${response.data.records_exported} records exported.`);
+      const response = await googleSheetsApi.export(exportData, { background: true });
+      const job = await jobsApi.wait(response.data.id);
+      if (job.status === 'failed') throw new Error(job.error);
+      alert(`Data exported successfully! ${job.result.records_exported} records exported.`);
     } catch (error) {
       console.error('Export failed:', error);
       alert('Export failed. Please check your Google Sheets configuration.');
@@ -25,19 +45,20 @@ export default function Reports() {
   const handleExportToCsv = async () => {
     setLoading(true);
     try {
-      const response = await googleSheetsApi.exportCsv();
-      const blob = new Blob([response.data.csv_data], { type: 'text/csv' });
-      const url = window.URL.createObjectURL(blob);
+      const response = await googleSheetsApi.exportCsv({ format: exportFormat });
+      const disposition = response.headers['content-disposition'] || '';
+      const filenameMatch = disposition.match(/filename="?([^";]+)"?/);
+      const url = window.URL.createObjectURL(response.data);
       const a = document.createElement('a');
       a.href = url;
-      a.download = response.data.filename;
+      a.download = filenameMatch ? filenameMatch[1] : `shifts_export.${exportFormat}`;
       document.body.appendChild(a);
       a.click();
       window.URL.revokeObjectURL(url);
       document.body.removeChild(a);
     } catch (error) {
-      console.error('CSV export failed:', error);
-      alert('CSV export failed.');
+      console.error('File export failed:', error);
+      alert('File export failed.');
     } finally {
       setLoading(false);
     }
@@ -49,8 +70,10 @@ export default function Reports() {
 
     setLoading(true);
     try {
-      const response = await googleSheetsApi.uploadCsv(file);
-      alert(`Import completed! ${response.data.imported_count} records imported.`);
+      const response = await googleSheetsApi.uploadCsv(file, { background: true });
+      const job = await jobsApi.wait(response.data.id);
+      if (job.status === 'failed') throw new Error(job.error);
+      alert(`Import completed! ${job.result.imported_count} records imported.`);
     } catch (error) {
       console.error('Import failed:', error);
       alert('Import failed.');
@@ -64,10 +87,52 @@ export default function Reports() {
       <div>
         <h1 className="text-2xl font-bold text-gray-900">Reports & Export</h1>
         <p className="mt-1 text-sm text-gray-500">
-          Export data to Google Sheets or CSV, and import data
+          Export data to Google Sheets or files, and import data
         </p>
       </div>
 
+      {/* Hours Summary */}
+      <div className="bg-white shadow rounded-lg p-6">
+        <div className="flex items-center justify-between mb-4">
+          <h3 className="text-lg font-medium text-gray-900">Hours by Position</h3>
+          <select
+            value={summaryPeriod}
+            onChange={(e) => setSummaryPeriod(e.target.value)}
+            className="border border-gray-300 rounded-md px-3 py-1 text-sm focus:outline-none focus:ring-blue-500 focus:border-blue-500"
+          >
+            <option value="day">Per day</option>
+            <option value="week">Per week</option>
+            <option value="month">Per month</option>
+          </select>
+        </div>
+        {summary.length === 0 ? (
+          <p className="text-sm text-gray-500">No completed hours this month</p>
+        ) : (
+          <table className="min-w-full divide-y divide-gray-200">
+            <thead>
+              <tr>
+                <th className="px-3 py-2 text-left text-xs font-medium text-gray-500 uppercase">From</th>
+                <th className="px-3 py-2 text-left text-xs font-medium text-gray-500 uppercase">Position</th>
+                <th className="px-3 py-2 text-right text-xs font-medium text-gray-500 uppercase">Records</th>
+                <th className="px-3 py-2 text-right text-xs font-medium text-gray-500 uppercase">Hours</th>
+                <th className="px-3 py-2 text-right text-xs font-medium text-gray-500 uppercase">Overtime</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-gray-200">
+              {summary.map((row) => (
+                <tr key={`${row.period_start}-${row.position}`}>
+                  <td className="px-3 py-2 text-sm text-gray-900">{new Date(row.period_start).toLocaleDateString()}</td>
+                  <td className="px-3 py-2 text-sm text-gray-900">{row.position || '—'}</td>
+                  <td className="px-3 py-2 text-sm text-gray-900 text-right">{row.record_count}</td>
+                  <td className="px-3 py-2 text-sm text-gray-900 text-right">{row.total_hours.toFixed(1)}</td>
+                  <td className="px-3 py-2 text-sm text-gray-900 text-right">{row.overtime_hours.toFixed(1)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        )}
+      </div>
+
       {/* Export Section */}
       <div className="bg-white shadow rounded-lg p-6">
         <h3 className="text-lg font-medium text-gray-900 mb-4">Export Data</h3>
@@ -116,21 +181,31 @@ export default function Reports() {
             </div>
           </div>
 
-          {/* CSV Export */}
+          {/* File Export */}
           <div className="border border-gray-200 rounded-lg p-4">
             <h4 className="text-md font-medium text-gray-900 mb-3">
-              Export to CSV
+              Export to File
             </h4>
             <p className="text-sm text-gray-500 mb-4">
-              Download all time tracking data as a CSV file
+              Download all time tracking data as a CSV, Excel, Parquet or Arrow file
             </p>
+            <select
+              value={exportFormat}
+              onChange={(e) => setExportFormat(e.target.value)}
+              className="w-full mb-4 border border-gray-300 rounded-md px-3 py-2 text-sm focus:outline-none focus:ring-blue-500 focus:border-blue-500"
+            >
+              <option value="csv">CSV</option>
+              <option value="xlsx">Excel (XLSX)</option>
+              <option value="parquet">Parquet</option>
+              <option value="arrow">Arrow</option>
+            </select>
             <button
               onClick={handleExportToCsv}
               disabled={loading}
               className="w-full inline-flex items-center justify-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-blue-500 disabled:bg-gray-400"
             >
               <DocumentArrowDownIcon className="h-4 w-4 mr-2" />
-              {loading ? 'Exporting...' : 'Download CSV'}
+              {loading ? 'Exporting...' : 'Download'}
             </button>
           </div>
         </div>
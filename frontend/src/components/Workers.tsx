@@ -13,8 +13,16 @@ interface Worker {
   created_at: string;
 }
 
+interface WorkerStats {
+  worker_id: number;
+  total_hours_week: number;
+  overtime_hours_week: number;
+  shifts_completed_week: number;
+}
+
 export default function Workers() {
   const [workers, setWorkers] = useState<Worker[]>([]);
+  const [stats, setStats] = useState<Record<number, WorkerStats>>({});
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
   const [editingWorker, setEditingWorker] = useState<Worker | null>(null);
@@ -34,6 +42,7 @@ export default function Workers() {
     try {
       const response = await workerApi.getAll();
       setWorkers(response.data);
+      fetchStats(response.data.map((worker: Worker) => worker.id));
     } catch (error) {
       console.error('Error fetching workers:', error);
     } finally {
@@ -41,6 +50,20 @@ export default function Workers() {
     }
   };
 
+  // Stats for the whole page in one request
+  const fetchStats = async (workerIds: number[]) => {
+    if (workerIds.length === 0) {
+      setStats({});
+      return;
+    }
+    try {
+      const response = await workerApi.getStatsBulk(workerIds);
+      setStats(Object.fromEntries(response.data.map((s: WorkerStats) => [s.worker_id, s])));
+    } catch (error) {
+      console.error('Error fetching worker stats:', error);
+    }
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     try {
@@ -125,6 +148,9 @@ export default function Workers() {
               <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                 Hourly Rate
               </th>
+              <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                This Week
+              </th>
               <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                 Status
               </th>
@@ -164,6 +190,23 @@ export default function Workers() {
                     ${worker.hourly_rate.toFixed(2)}
                   </div>
                 </td>
+                <td className="px-6 py-4 whitespace-nowrap">
+                  {stats[worker.id] && (
+                    <>
+                      <div className="text-sm text-gray-900">
+                        {stats[worker.id].total_hours_week.toFixed(1)}h
+                        {stats[worker.id].overtime_hours_week > 0 && (
+                          <span className="text-orange-600">
+                            {' '}(+{stats[worker.id].overtime_hours_week.toFixed(1)}h OT)
+                          </span>
+                        )}
+                      </div>
+                      <div className="text-sm text-gray-500">
+                        {stats[worker.id].shifts_completed_week} shifts
+                      </div>
+                    </>
+                  )}
+                </td>
                 <td className="px-6 py-4 whitespace-nowrap">
                   <span
                     className={`inline-flex px-2 py-1 text-xs font-semibold rounded-full ${
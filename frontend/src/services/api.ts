@@ -47,6 +47,7 @@ export const workerApi = {
   update: (id: number, data: any) => api.put(`/workers/${id}`, data),
   delete: (id: number) => api.delete(`/workers/${id}`),
   getStats: (id: number) => api.get(`/workers/${id}/stats`),
+  getStatsBulk: (ids: number[]) => api.get('/workers/stats', { params: { ids: ids.join(',') } }),
 };
 
 export const shiftApi = {
@@ -64,23 +65,48 @@ export const trackingApi = {
   clockOut: (recordId: number) => api.put(`/tracking/clock-out/${recordId}`),
   startBreak: (recordId: number) => api.put(`/tracking/break-start/${recordId}`),
   endBreak: (recordId: number) => api.put(`/tracking/break-end/${recordId}`),
-  getActive: () => api.get('/tracking/active'),
-  getWorkerActive: (workerId: number) => api.get(`/tracking/worker/${workerId}/active`),
+  getActive: () => api.get('/tracking/active', { params: { expand: 'worker' } }),
+  getWorkerActive: (workerId: number) =>
+    api.get(`/tracking/worker/${workerId}/active`, { params: { expand: 'worker' } }),
   getRecords: (params?: any) => api.get('/tracking/records', { params }),
   getDashboard: () => api.get('/tracking/dashboard'),
+  streamEvents: () => new EventSource(`${API_BASE_URL}/tracking/stream`),
+};
+
+export const reportsApi = {
+  getSummary: (params?: any) => api.get('/reports/summary', { params }),
 };
 
 export const googleSheetsApi = {
-  export: (data: any) => api.post('/google-sheets/export', data),
-  import: (data: any) => api.post('/google-sheets/import', data),
-  uploadCsv: (file: File) => {
+  export: (data: any, params?: any) => api.post('/google-sheets/export', data, { params }),
+  import: (data: any, params?: any) => api.post('/google-sheets/import', data, { params }),
+  uploadCsv: (file: File, params?: any) => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/google-sheets/upload-csv', formData, {
+      params,
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
   },
-  exportCsv: (params?: any) => api.get('/google-sheets/export-csv', { params }),
-}; 
\ No newline at end of file
+  exportCsv: (params?: any) =>
+    api.get('/google-sheets/export-csv', {
+      params: { ...params, stream: true },
+      responseType: 'blob',
+    }),
+}; 
+
+export const jobsApi = {
+  get: (id: number) => api.get(`/jobs/${id}`),
+  // Polls a background job until it has succeeded or failed
+  wait: async (id: number, intervalMs = 1000) => {
+    for (;;) {
+      const response = await api.get(`/jobs/${id}`);
+      if (response.data.status === 'succeeded' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+};